@@ -0,0 +1,75 @@
+from sqlalchemy import and_, func, select
+from app import db
+from models import Budget, MonthlyRollup
+import ledger
+import serializers
+
+
+def rollup_totals_select(user_id, year=None, month=None):
+    stmt = (
+        select(MonthlyRollup.kind, func.sum(MonthlyRollup.total))
+        .where(MonthlyRollup.user_id == user_id)
+        .group_by(MonthlyRollup.kind)
+    )
+    if year is not None:
+        stmt = stmt.where(MonthlyRollup.year == year, MonthlyRollup.month == month)
+    return stmt
+
+
+def totals_from(rows):
+    totals = {'income': 0.0, 'expense': 0.0}
+    totals.update(rows)
+    return totals
+
+
+def rollup_totals(user_id, year=None, month=None):
+    return totals_from(db.session.execute(rollup_totals_select(user_id, year, month)).all())
+
+
+def balance(user_id):
+    return ledger.balance_at(user_id)
+
+
+def monthly_summary_from(totals):
+    return {
+        'total_income': totals['income'],
+        'total_expenses': totals['expense']
+    }
+
+
+def monthly_summary(user_id, year, month):
+    return monthly_summary_from(rollup_totals(user_id, year, month))
+
+
+def budget_status_select(user_id, year=None, month=None):
+    spent = func.coalesce(MonthlyRollup.total, 0.0)
+    stmt = (
+        select(Budget.id, Budget.category, Budget.year, Budget.month, Budget.limit, spent)
+        .outerjoin(MonthlyRollup, and_(
+            MonthlyRollup.user_id == Budget.user_id,
+            MonthlyRollup.year == Budget.year,
+            MonthlyRollup.month == Budget.month,
+            MonthlyRollup.kind == 'expense',
+            MonthlyRollup.category == Budget.category
+        ))
+        .where(Budget.user_id == user_id)
+        .order_by(Budget.year, Budget.month, Budget.category)
+    )
+    if year is not None:
+        stmt = stmt.where(Budget.year == year)
+    if month is not None:
+        stmt = stmt.where(Budget.month == month)
+    return stmt
+
+
+def budget_status_from(rows):
+    return [
+        serializers.BudgetStatus(
+            id, category, budget_year, budget_month, limit, spent, limit - spent,
+            round(spent / limit * 100, 2) if limit else None
+        ) for id, category, budget_year, budget_month, limit, spent in rows
+    ]
+
+
+def budget_status(user_id, year=None, month=None):
+    return budget_status_from(db.session.execute(budget_status_select(user_id, year, month)))
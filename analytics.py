@@ -0,0 +1,124 @@
+import numpy as np
+from sqlalchemy import String, cast, select
+from app import db, cache
+from models import Income, Expense
+import versions
+
+GRANULARITIES = ('day', 'week', 'month')
+DEFAULT_WINDOW = 3
+MAX_WINDOW = 366
+PERCENTILES = (50, 90, 99)
+
+
+def load(model, user_id, start_date=None, end_date=None, label=None):
+    # One columnar read: dates as datetime64[D], amounts as float64 and, when
+    # asked for, labels as a string array. Dates come back as ISO text so NumPy
+    # parses them in C instead of going through a date object per row.
+    columns = [cast(model.date, String), model.amount]
+    if label is not None:
+        columns.append(label)
+    stmt = select(*columns).where(model.user_id == user_id)
+    if start_date is not None:
+        stmt = stmt.where(model.date >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(model.date <= end_date)
+    # Core execution on the session's connection skips ORM row processing.
+    rows = db.session.connection().execute(stmt).all()
+    result = [np.array([], dtype='datetime64[D]'), np.array([], dtype=float), np.array([], dtype=str)]
+    for i, values in enumerate(zip(*rows)):
+        result[i] = np.array(values, dtype=result[i].dtype if i < 2 else str)
+    return result[:len(columns)]
+
+
+# Periods are numbered from the epoch so any two dates map to comparable
+# integers: days, Monday-based weeks (1970-01-01 was a Thursday) or months.
+def period_numbers(dates, granularity):
+    if granularity == 'month':
+        return dates.astype('datetime64[M]').astype(np.int64)
+    days = dates.astype(np.int64)
+    if granularity == 'week':
+        return (days + 3) // 7
+    return days
+
+
+def period_starts(numbers, granularity):
+    if granularity == 'month':
+        return numbers.astype('datetime64[M]').astype('datetime64[D]')
+    if granularity == 'week':
+        return (numbers * 7 - 3).astype('datetime64[D]')
+    return numbers.astype('datetime64[D]')
+
+
+def rolling_mean(values, window):
+    # Trailing mean along the last axis; the first window - 1 periods average
+    # over what is available.
+    totals = np.cumsum(values, axis=-1)
+    shifted = np.zeros_like(totals)
+    shifted[..., window:] = totals[..., :-window]
+    counts = np.minimum(np.arange(1, values.shape[-1] + 1), window)
+    return (totals - shifted) / counts
+
+
+def _percentiles(values):
+    if not len(values):
+        return {f'p{p}': None for p in PERCENTILES}
+    return {f'p{p}': round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def _rounded(values):
+    return np.round(values, 2).tolist()
+
+
+def compute(user_id, granularity='month', window=DEFAULT_WINDOW, start_date=None, end_date=None):
+    income_dates, income_amounts = load(Income, user_id, start_date, end_date)
+    expense_dates, expense_amounts, categories = load(Expense, user_id, start_date, end_date, Expense.category)
+
+    income_periods = period_numbers(income_dates, granularity)
+    expense_periods = period_numbers(expense_dates, granularity)
+    both = np.concatenate([income_periods, expense_periods])
+    if not len(both):
+        first, count = 0, 0
+    else:
+        first = both.min()
+        count = int(both.max() - first + 1)
+
+    # Empty periods in between are kept as zeros, so every series is evenly
+    # spaced. bincount returns ints when there are no weights to sum.
+    income = np.bincount(income_periods - first, weights=income_amounts, minlength=count).astype(float)
+    expense = np.bincount(expense_periods - first, weights=expense_amounts, minlength=count).astype(float)
+
+    names, codes = np.unique(categories, return_inverse=True)
+    by_category = np.bincount(
+        codes * count + (expense_periods - first), weights=expense_amounts, minlength=len(names) * count
+    ).astype(float).reshape(len(names), count)
+    category_means = rolling_mean(by_category, window)
+    category_totals = by_category.sum(axis=1)
+    spent = category_totals.sum()
+    shares = category_totals / spent if spent else np.zeros_like(category_totals)
+
+    return {
+        'granularity': granularity,
+        'window': window,
+        'periods': [day.isoformat() for day in period_starts(first + np.arange(count), granularity).tolist()],
+        'income': _rounded(income),
+        'expense': _rounded(expense),
+        'net': _rounded(income - expense),
+        'expense_rolling_mean': _rounded(rolling_mean(expense, window)),
+        'categories': {
+            name: {
+                'expense': _rounded(by_category[i]),
+                'rolling_mean': _rounded(category_means[i]),
+                'total': round(float(category_totals[i]), 2),
+                'share': round(float(shares[i]), 4),
+            } for i, name in enumerate(names.tolist())
+        },
+        'percentiles': {
+            'transaction': _percentiles(expense_amounts),
+            'period': _percentiles(expense),
+        },
+    }
+
+
+def summary(user_id, granularity='month', window=DEFAULT_WINDOW, start_date=None, end_date=None):
+    key = f'analytics:{user_id}:{versions.current(user_id)}:{granularity}:{window}:{start_date}:{end_date}'
+    return cache.memoize(key, lambda: compute(user_id, granularity, window, start_date, end_date))
@@ -6,29 +6,62 @@ from flask_session import Session
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS  
 from config import Config
+from cache import ResponseCache
+from hashing import PasswordHasher
+from replicas import ReplicaRouter, RoutingSession
+from pools import PoolMonitor
+from instrumentation import RequestMetrics
+from profiling import RequestProfiler
+import sessions
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 ma = Marshmallow()
 session = Session()
 jwt = JWTManager()
+cache = ResponseCache()
+hasher = PasswordHasher()
+router = ReplicaRouter()
+pool_monitor = PoolMonitor()
+request_metrics = RequestMetrics()
+profiler = RequestProfiler()
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    router.init_app(app)
+    pool_monitor.init_app(app)
     db.init_app(app)
     migrate.init_app(app, db)
     ma.init_app(app)
-    session.init_app(app)
+    if app.config['SESSION_TYPE'] in sessions.STORES:
+        sessions.init_app(app)
+    else:
+        session.init_app(app)
     jwt.init_app(app)
+    cache.init_app(app)
+    hasher.init_app(app)
+    request_metrics.init_app(app)
+    profiler.init_app(app)
     
     CORS(app)
     
     from routes import bp_routes
     from auth import bp_auth
+    from metrics import bp_metrics
     app.register_blueprint(bp_routes, url_prefix='/routes')
     app.register_blueprint(bp_auth, url_prefix='/auth')
+    app.register_blueprint(bp_metrics, url_prefix='/metrics')
+
+    from rollup import rollup_cli
+    from ledger import ledger_cli
+    from query_plans import check_query_plans_command
+    from seed import seed_command
+    app.cli.add_command(rollup_cli)
+    app.cli.add_command(ledger_cli)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(seed_command)
 
     return app
 
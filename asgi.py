@@ -0,0 +1,224 @@
+from datetime import datetime
+from urllib.parse import parse_qsl
+from a2wsgi import WSGIMiddleware
+from flask_jwt_extended import decode_token
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_etags, quote_etag
+from app import create_app, db, pool_monitor, router
+from config import Config
+import aggregates
+import etags
+import feed
+import ledger
+import pools
+import replicas
+import serializers
+import versions
+
+# Run with: uvicorn --factory asgi:create_asgi_app
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+}
+
+
+def async_url(url):
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f'No async driver for {backend!r}; set ASYNC_DATABASE_URL')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+# GET endpoints answered on the event loop, keyed by path. A handler gets a
+# connection, the caller's identity and the query arguments, and returns the
+# body to encode, or None to let the Flask view answer (e.g. with its 400).
+READS = {}
+
+
+def read(path, conditional=False):
+    def register(handler):
+        READS['/routes' + path] = (handler, conditional)
+        return handler
+    return register
+
+
+async def _all(connection, stmt):
+    return (await connection.execute(stmt)).all()
+
+
+@read('/transactions', conditional=True)
+async def transactions(connection, user_id, args):
+    try:
+        filters = feed.parse_filters(args)
+    except ValueError:
+        return None
+    limit = feed.parse_limit(args, feed.DEFAULT_LIMIT)
+    if limit is None:
+        return None
+    try:
+        selects = feed.page_selects(user_id, limit, args.get('after'), **filters)
+    except feed.InvalidCursor:
+        return None
+    return feed.page_from({kind: await _all(connection, stmt) for kind, stmt in selects.items()}, limit)
+
+
+@read('/recent_transactions', conditional=True)
+async def recent_transactions(connection, user_id, args):
+    limit = feed.parse_limit(args, 5)
+    if limit is None:
+        return None
+    selects = feed.page_selects(user_id, limit)
+    return feed.page_from({kind: await _all(connection, stmt) for kind, stmt in selects.items()}, limit)
+
+
+@read('/balance')
+async def balance(connection, user_id, args):
+    balance = (await connection.execute(ledger.balance_select(user_id))).scalar()
+    return {'balance': balance if balance is not None else 0.0}
+
+
+@read('/balance/at')
+async def balance_at(connection, user_id, args):
+    try:
+        day = datetime.strptime(args['date'], '%Y-%m-%d').date()
+    except (KeyError, ValueError):
+        return None
+    balance = (await connection.execute(ledger.balance_select(user_id, day))).scalar()
+    return {'date': day.isoformat(), 'balance': balance if balance is not None else 0.0}
+
+
+@read('/balance/history', conditional=True)
+async def balance_history(connection, user_id, args):
+    try:
+        filters = feed.parse_filters(args)
+    except ValueError:
+        return None
+    stmt = ledger.history_select(user_id, filters['start_date'], filters['end_date'])
+    return ledger.history_from(await _all(connection, stmt), filters['start_date'])
+
+
+@read('/monthly_summary')
+async def monthly_summary(connection, user_id, args):
+    year = args.get('year', default=datetime.utcnow().year, type=int)
+    month = args.get('month', default=datetime.utcnow().month, type=int)
+    if not 1 <= month <= 12 or not 1900 <= year <= datetime.utcnow().year:
+        return None
+    rows = await _all(connection, aggregates.rollup_totals_select(user_id, year, month))
+    return aggregates.monthly_summary_from(aggregates.totals_from(rows))
+
+
+@read('/budget/status', conditional=True)
+async def budget_status(connection, user_id, args):
+    year = args.get('year', type=int)
+    month = args.get('month', type=int)
+    if month is not None and not 1 <= month <= 12:
+        return None
+    return aggregates.budget_status_from(
+        await _all(connection, aggregates.budget_status_select(user_id, year, month))
+    )
+
+
+class AsyncAPI:
+    # The Flask app behind an ASGI interface. Reads in READS run on an async
+    # engine; everything else, including any request the fast path declines,
+    # runs in Flask on a thread pool, so both paths share one API.
+    def __init__(self, app):
+        self.app = app
+        self.wsgi = WSGIMiddleware(app, workers=app.config['ASGI_THREADS'])
+        with app.app_context():
+            url = app.config['ASYNC_DATABASE_URL'] or async_url(db.engine.url)
+            replica = db.engines.get(replicas.REPLICA)
+        self.engine = self._create_engine('async', url)
+        self.replica = self._create_engine('async_replica', async_url(replica.url)) if replica is not None else None
+
+    def _create_engine(self, name, url):
+        engine = create_async_engine(url, **pools.pool_options(url, self.app.config, asyncio=True))
+        pool_monitor.watch(name, engine.sync_engine)
+        return engine
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        route = READS.get(scope['path']) if scope['type'] == 'http' and scope['method'] == 'GET' else None
+        if route is None or not await self._read(route, scope, send):
+            await self.wsgi(scope, receive, send)
+
+    def _identity(self, authorization):
+        # Only a valid access token is served here; Flask renders the 401/422
+        # for anything else exactly as before.
+        scheme, _, token = (authorization or '').partition(' ')
+        if scheme != 'Bearer' or not token:
+            return None
+        try:
+            with self.app.app_context():
+                claims = decode_token(token)
+        except Exception:
+            return None
+        if claims.get('type') != 'access':
+            return None
+        return claims.get(self.app.config['JWT_IDENTITY_CLAIM'])
+
+    def _engine_for(self, user_id):
+        if self.replica is None:
+            return self.engine
+        with self.app.app_context():
+            return self.engine if router.recently_wrote(user_id) else self.replica
+
+    async def _read(self, route, scope, send):
+        handler, conditional = route
+        headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in scope['headers']}
+        user_id = self._identity(headers.get('authorization'))
+        if user_id is None:
+            return False
+        query = scope['query_string'].decode('latin-1')
+        args = MultiDict(parse_qsl(query, keep_blank_values=True))
+
+        response_headers = []
+        async with self._engine_for(user_id).connect() as connection:
+            version = None
+            if conditional:
+                version = (await connection.execute(versions.version_select(user_id))).scalar()
+            etag = etags.make_etag(user_id, version, f"{scope['path']}?{query}") if version is not None else None
+            if etag is not None and parse_etags(headers.get('if-none-match')).contains(etag):
+                status, body = 304, b''
+            else:
+                result = await handler(connection, user_id, args)
+                if result is None:
+                    return False
+                status, body = 200, serializers.encoder.encode(result)
+                response_headers.append((b'content-type', b'application/json'))
+
+        if etag is not None:
+            response_headers.append((b'etag', quote_etag(etag).encode()))
+            response_headers.append((b'cache-control', b'private, no-cache'))
+        # The headers Flask-CORS sends with its defaults.
+        if 'origin' in headers:
+            response_headers.append((b'access-control-allow-origin', headers['origin'].encode('latin-1')))
+            response_headers.append((b'vary', b'Origin'))
+        else:
+            response_headers.append((b'access-control-allow-origin', b'*'))
+        response_headers.append((b'content-length', str(len(body)).encode()))
+        await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': body})
+        return True
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                if self.replica is not None:
+                    await self.replica.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_asgi_app(config_class=Config):
+    return AsyncAPI(create_app(config_class))
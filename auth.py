@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token, jwt_required
-from app import db
+from app import db, hasher
+from hashing import HashingBusy
 from models import User  
 from schemas import validate_user
 
@@ -27,7 +27,10 @@ def signup():
     if User.query.filter_by(email=email).first():
         return jsonify({'message': 'Email already exists'}), 400
 
-    hashed_password = generate_password_hash(password, method='pbkdf2:sha256')
+    try:
+        hashed_password = hasher.hash(password)
+    except HashingBusy:
+        return jsonify({'message': 'Server busy, please retry'}), 503
     new_user = User(username=username, password=hashed_password, email=email)
     db.session.add(new_user)
     db.session.commit()
@@ -44,7 +47,19 @@ def login():
         return jsonify({'message': 'Username and password are required'}), 400
     
     user = User.query.filter_by(username=username).first()
-    if user and check_password_hash(user.password, password):
+    try:
+        valid = user is not None and hasher.verify(user.password, password)
+    except HashingBusy:
+        return jsonify({'message': 'Server busy, please retry'}), 503
+
+    if valid:
+        # Upgrade hashes made with older cost settings; a busy pool just defers it.
+        if hasher.needs_rehash(user.password):
+            try:
+                user.password = hasher.hash(password)
+                db.session.commit()
+            except HashingBusy:
+                pass
         access_token = create_access_token(identity=user.id)
         return jsonify({
             'message': 'Login successful',
@@ -0,0 +1,86 @@
+from flask import current_app, g
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RequestRedirect
+from app import db
+import dialects
+
+# The single-record write views of /income, /expense, /budget and
+# /financial_goals. Bulk and import endpoints manage their own transactions.
+ENDPOINTS = {
+    f'routes.{action}_{resource}'
+    for action in ('add', 'update', 'delete')
+    for resource in ('income', 'expense', 'budget', 'financial_goal')
+}
+
+
+def commit():
+    # Write views commit through here. Inside a batch the operation only
+    # flushes into its savepoint and the batch commits once at the end.
+    if g.get('_batch'):
+        db.session.flush()
+    else:
+        db.session.commit()
+
+
+def _check(operation):
+    if not isinstance(operation, dict):
+        return 'Each operation must be an object with "method" and "path".'
+    if not isinstance(operation.get('method'), str) or not isinstance(operation.get('path'), str):
+        return 'Each operation must have a string "method" and "path".'
+    return None
+
+
+def _run_one(adapter, prefix, operation):
+    error = _check(operation)
+    if error:
+        return 400, {'message': error}
+    method, path = operation['method'].upper(), prefix + operation['path']
+    try:
+        endpoint, view_args = adapter.match(path, method=method)
+    except RequestRedirect:
+        return 404, {'message': f'No route for {operation["path"]}.'}
+    except HTTPException as e:
+        return e.code, {'message': e.description}
+    if endpoint not in ENDPOINTS:
+        return 400, {'message': 'Only POST, PUT and DELETE on /income, /expense, /budget and /financial_goals can be batched.'}
+    # The batch request has already verified the token, so call the view
+    # under jwt_required; its identity is read from the shared g.
+    view = current_app.view_functions[endpoint].__wrapped__
+    savepoint = db.session.begin_nested()
+    try:
+        with current_app.test_request_context(path, method=method, json=operation.get('body')):
+            response = current_app.make_response(view(**view_args))
+    except HTTPException as e:
+        savepoint.rollback()
+        return e.code, {'message': e.description}
+    except Exception:
+        savepoint.rollback()
+        current_app.logger.exception('Batch operation %s %s failed', method, path)
+        return 500, {'message': 'Internal server error'}
+    if response.status_code >= 400:
+        savepoint.rollback()
+    else:
+        savepoint.commit()
+    return response.status_code, response.get_json(silent=True)
+
+
+def run(operations, prefix, atomic=True):
+    # Runs the operations in order in one transaction. Each gets a savepoint,
+    # so a failed one leaves no partial writes. An atomic batch stops at the
+    # first failure and commits nothing; otherwise the successful operations
+    # are committed together. Returns (results, committed).
+    adapter = current_app.url_map.bind('localhost')
+    results = []
+    dialects.begin_for_savepoints()
+    g._batch = True
+    try:
+        for operation in operations:
+            status, body = _run_one(adapter, prefix, operation)
+            results.append({'status': status, 'body': body})
+            if status >= 400 and atomic:
+                db.session.rollback()
+                return results, False
+    finally:
+        g._batch = False
+    db.session.commit()
+    return results, True
@@ -0,0 +1,87 @@
+"""Time GET /routes/analytics for large histories, cold and from the cache.
+
+Run from the repository root:
+
+    python benchmarks/bench_analytics.py [--sizes 10000,100000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from config import Config
+from app import create_app, db
+
+
+class BenchConfig(Config):
+    SECRET_KEY = 'bench'
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    CACHE_TYPE = 'memory'
+
+
+def seed(user_id, n_rows):
+    from models import Income, Expense
+    rng = random.Random(n_rows)
+    first_day = date(2015, 1, 1)
+    for model, label_field, labels in ((Income, 'source', ['Salary', 'Freelance', 'Interest']),
+                                       (Expense, 'category', ['Food', 'Rent', 'Transport', 'Fun'])):
+        rows = [{
+            'amount': round(rng.uniform(1, 500), 2),
+            label_field: rng.choice(labels),
+            'date': first_day + timedelta(days=rng.randrange(3650)),
+            'description': '',
+            'user_id': user_id
+        } for _ in range(n_rows // 2)]
+        db.session.execute(db.insert(model), rows)
+    db.session.commit()
+
+
+def timed(client, url, headers, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url, headers=headers)
+        timings.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.status_code
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='10000,100000')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app(BenchConfig)
+    client = app.test_client()
+    with app.app_context():
+        from models import User
+        import analytics
+        db.create_all()
+        print(f"{'rows':>8} {'granularity':>11} {'compute ms':>11} {'cached ms':>10}")
+        for user_id, size in enumerate(int(s) for s in args.sizes.split(',')):
+            user = User(username=f'bench{user_id}', email=f'bench{user_id}@example.com', password='x')
+            db.session.add(user)
+            db.session.commit()
+            uid = user.id
+            seed(uid, size)
+            headers = {'Authorization': f'Bearer {create_access_token(identity=uid)}'}
+            for granularity in analytics.GRANULARITIES:
+                url = f'/routes/analytics?granularity={granularity}'
+                compute_timings = []
+                for _ in range(args.repeat):
+                    app.extensions['response_cache'].clear()
+                    compute_timings.append(timed(client, url, headers, 1))
+                cached = timed(client, url, headers, args.repeat)
+                print(f'{size:>8} {granularity:>11} {statistics.median(compute_timings):>11.2f} {cached:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""Load the read endpoints through gunicorn (WSGI) and uvicorn (ASGI) on one database.
+
+Both servers are started as subprocesses against the same seeded database and
+driven by the same keep-alive HTTP client for --duration seconds at each
+concurrency level. Reports requests/sec and p50/p99 latency. The client runs in
+this process, so compare the two servers rather than reading absolute numbers.
+
+Run from the repository root:
+
+    python benchmarks/bench_asgi.py [--concurrency 16,64] [--duration 10] [--database-url URL]
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from flask_jwt_extended import create_access_token
+from config import Config
+from app import create_app, db
+from loadclient import Connection, percentile
+
+PATHS = [
+    '/routes/transactions?limit=20',
+    '/routes/recent_transactions',
+    '/routes/balance',
+    '/routes/monthly_summary?year=2024&month=6',
+    '/routes/budget/status?year=2024',
+]
+
+
+def seed(url, n_users, n_rows):
+    class BenchConfig(Config):
+        SECRET_KEY = 'bench'
+        SQLALCHEMY_DATABASE_URI = url
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        from models import User, Income, Expense, Budget
+        import ledger
+        import rollup
+        db.create_all()
+        rng = random.Random(n_rows)
+        tokens = []
+        for n in range(n_users):
+            user = User(username=f'load{n}', email=f'load{n}@example.com', password='x')
+            db.session.add(user)
+            db.session.flush()
+            for model, label_field, labels in ((Income, 'source', ['Salary', 'Freelance']),
+                                               (Expense, 'category', ['Food', 'Rent', 'Transport'])):
+                db.session.execute(db.insert(model), [{
+                    'amount': round(rng.uniform(1, 500), 2),
+                    label_field: rng.choice(labels),
+                    'date': date(2023, 1, 1) + timedelta(days=rng.randrange(730)),
+                    'description': '',
+                    'user_id': user.id
+                } for _ in range(n_rows // 2)])
+            db.session.execute(db.insert(Budget), [
+                {'category': category, 'limit': 1000.0, 'year': 2024, 'month': month, 'user_id': user.id}
+                for category in ('Food', 'Rent') for month in range(1, 13)
+            ])
+            tokens.append(create_access_token(identity=user.id))
+        rollup.rebuild()
+        ledger.rebuild()
+        db.session.commit()
+    return tokens
+
+
+def wait_for(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'server on port {port} did not start')
+
+
+async def client(url, requests, deadline, latencies, errors):
+    connection = Connection(url)
+    i = random.randrange(len(requests))
+    while time.perf_counter() < deadline:
+        path, headers = requests[i % len(requests)]
+        started = time.perf_counter()
+        status, _ = await connection.request('GET', path, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        if status != 200:
+            errors.append(status)
+        i += 1
+    connection.close()
+
+
+async def load(url, requests, concurrency, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(client(url, requests, deadline, latencies, errors) for _ in range(concurrency)))
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--concurrency', default='16,64')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--rows', type=int, default=2000, help='transactions per user')
+    parser.add_argument('--workers', type=int, default=2, help='processes per server')
+    parser.add_argument('--threads', type=int, default=8, help='gunicorn threads per worker')
+    parser.add_argument('--database-url', default=None, help='defaults to a throwaway SQLite file')
+    parser.add_argument('--port', type=int, default=8701)
+    args = parser.parse_args()
+
+    url = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    tokens = seed(url, args.users, args.rows)
+    requests = [(path, {'Authorization': f'Bearer {token}'}) for token in tokens for path in PATHS]
+
+    env = dict(os.environ, DATABASE_URL=url, SECRET_KEY='bench', SESSION_TYPE='memory',
+               CACHE_TYPE='null', PASSWORD_HASH_WORKERS='0')
+    servers = {
+        'wsgi': ['gunicorn', '--workers', str(args.workers), '--threads', str(args.threads),
+                 '--bind', f'127.0.0.1:{args.port}', '--log-level', 'warning', 'app:create_app()'],
+        'asgi': ['uvicorn', '--factory', 'asgi:create_asgi_app', '--workers', str(args.workers),
+                 '--port', str(args.port + 1), '--log-level', 'warning', '--no-access-log'],
+    }
+
+    print(f"{'server':>6} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for offset, (name, command) in enumerate(servers.items()):
+        port = args.port + offset
+        base_url = f'http://127.0.0.1:{port}'
+        server = subprocess.Popen([sys.executable, '-m', *command], cwd=ROOT, env=env)
+        try:
+            wait_for(port)
+            asyncio.run(load(base_url, requests, 4, 1))
+            for concurrency in (int(c) for c in args.concurrency.split(',')):
+                latencies, errors = asyncio.run(load(base_url, requests, concurrency, args.duration))
+                latencies.sort()
+                print(f'{name:>6} {concurrency:>5} {len(latencies) / args.duration:>9.0f} '
+                      f'{percentile(latencies, 50) * 1000:>8.2f} {percentile(latencies, 99) * 1000:>8.2f} '
+                      f'{len(errors):>7}')
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
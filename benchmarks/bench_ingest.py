@@ -0,0 +1,82 @@
+"""Rows per second for bulk expense ingestion through POST /routes/expense/bulk.
+
+Run from the repository root:
+
+    python benchmarks/bench_ingest.py [--sizes 10000,100000] [--legacy]
+
+--legacy also times the list branch of POST /routes/expense for comparison.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from config import Config
+from app import create_app, db
+
+
+class BenchConfig(Config):
+    SECRET_KEY = 'bench'
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+
+def make_rows(n_rows, invalid_every=0):
+    rng = random.Random(n_rows)
+    first_day = date(2015, 1, 1)
+    rows = []
+    for i in range(n_rows):
+        rows.append({
+            'amount': round(rng.uniform(1, 500), 2),
+            'category': rng.choice(['Food', 'Rent', 'Transport', 'Fun']),
+            'date': (first_day + timedelta(days=rng.randrange(3650))).isoformat(),
+            'description': 'bench'
+        })
+        if invalid_every and i % invalid_every == 0:
+            rows[-1]['amount'] = -1
+    return rows
+
+
+def run(client, headers, path, rows):
+    started = time.perf_counter()
+    response = client.post(path, json=rows, headers=headers)
+    elapsed = time.perf_counter() - started
+    assert response.status_code in (201, 207), response.get_data(as_text=True)[:200]
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='10000,100000')
+    parser.add_argument('--invalid-every', type=int, default=100,
+                        help='Make every Nth row invalid (0 disables).')
+    parser.add_argument('--legacy', action='store_true')
+    args = parser.parse_args()
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        from models import User
+        db.create_all()
+        user = User(username='bench', email='bench@example.com', password='x')
+        db.session.add(user)
+        db.session.commit()
+        headers = {'Authorization': 'Bearer ' + create_access_token(identity=user.id)}
+
+    client = app.test_client()
+    print(f"{'rows':>8} {'path':>8} {'seconds':>9} {'rows/s':>10}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        paths = [('bulk', '/routes/expense/bulk', make_rows(size, args.invalid_every))]
+        if args.legacy:
+            paths.append(('legacy', '/routes/expense', make_rows(size)))
+        for name, path, rows in paths:
+            elapsed = run(client, headers, path, rows)
+            print(f'{size:>8} {name:>8} {elapsed:>9.2f} {size / elapsed:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
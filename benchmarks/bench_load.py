@@ -0,0 +1,300 @@
+"""Drive every /routes endpoint concurrently against a running server.
+
+Each virtual user logs in through /auth/login as one seeded user, then runs a
+weighted mix of reads and create/update/delete cycles for --duration seconds.
+Throughput and p50/p95/p99 latency are reported per endpoint and written to a
+JSON file; pass an earlier file as --baseline to print the change.
+
+Seed a database and start a server first, e.g.:
+
+    flask seed --users 1000 --transactions 1000
+    gunicorn --workers 4 --threads 8 'app:create_app()'
+    python benchmarks/bench_load.py --url http://127.0.0.1:8000 --users 50 --output run.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loadclient import Connection, Recorder
+
+TODAY = date.today()
+
+
+class VirtualUser:
+    def __init__(self, number, url, username, password, recorder, rng):
+        self.number = number
+        self.http = Connection(url)
+        self.username = username
+        self.password = password
+        self.recorder = recorder
+        self.rng = rng
+        self.token = None
+        self.budget_ids = []
+        self.writes = 0
+
+    async def login(self):
+        status, body = await self.recorder.timed('POST /auth/login', self.http.request(
+            'POST', '/auth/login', json_body={'username': self.username, 'password': self.password}
+        ))
+        if status != 200:
+            raise RuntimeError(f'login as {self.username} failed with {status}: {body[:200]!r}')
+        self.token = json.loads(body)['access_token']
+
+    async def call(self, name, method, target, **kwargs):
+        headers = {'Authorization': f'Bearer {self.token}', **kwargs.pop('headers', {})}
+        status, body = await self.recorder.timed(name, self.http.request(method, target, headers=headers, **kwargs))
+        if status == 401:
+            await self.login()
+        return status, body
+
+    def marker(self):
+        self.writes += 1
+        return f'load-{self.number}-{self.writes}'
+
+    def day(self, within=730):
+        return (TODAY - timedelta(days=self.rng.randrange(within))).isoformat()
+
+    # Reads
+
+    async def transactions(self):
+        query = self.rng.choice(['limit=50', f'start_date={self.day(365)}&limit=20', 'category=Food&limit=20'])
+        status, body = await self.call('GET /routes/transactions', 'GET', f'/routes/transactions?{query}')
+        cursor = json.loads(body).get('next_cursor') if status == 200 else None
+        if cursor:
+            await self.call('GET /routes/transactions', 'GET', f'/routes/transactions?{query}&after={cursor}')
+
+    async def recent_transactions(self):
+        await self.call('GET /routes/recent_transactions', 'GET', '/routes/recent_transactions')
+
+    async def export(self):
+        await self.call('GET /routes/export', 'GET', f'/routes/export?format=ndjson&start_date={self.day(60)}')
+
+    async def analytics(self):
+        granularity = self.rng.choice(['day', 'week', 'month'])
+        await self.call('GET /routes/analytics', 'GET', f'/routes/analytics?granularity={granularity}')
+
+    async def balance(self):
+        await self.call('GET /routes/balance', 'GET', '/routes/balance')
+
+    async def balance_at(self):
+        await self.call('GET /routes/balance/at', 'GET', f'/routes/balance/at?date={self.day()}')
+
+    async def balance_history(self):
+        await self.call('GET /routes/balance/history', 'GET', f'/routes/balance/history?start_date={self.day(180)}')
+
+    async def monthly_summary(self):
+        month = TODAY - timedelta(days=self.rng.randrange(365))
+        await self.call('GET /routes/monthly_summary', 'GET',
+                        f'/routes/monthly_summary?year={month.year}&month={month.month}')
+
+    async def budgets(self):
+        status, body = await self.call('GET /routes/budget', 'GET', '/routes/budget')
+        if status == 200:
+            self.budget_ids = [budget['id'] for budget in json.loads(body)]
+
+    async def budget(self):
+        if not self.budget_ids:
+            return await self.budgets()
+        await self.call('GET /routes/budget/<id>', 'GET', f'/routes/budget/{self.rng.choice(self.budget_ids)}')
+
+    async def budget_status(self):
+        await self.call('GET /routes/budget/status', 'GET', f'/routes/budget/status?year={TODAY.year}')
+
+    async def financial_goals(self):
+        await self.call('GET /routes/financial_goals', 'GET', '/routes/financial_goals')
+
+    async def projections(self):
+        await self.call('GET /routes/financial_goals/projections', 'GET', '/routes/financial_goals/projections')
+
+    # Writes: create, find the new row by its marker, update it, delete it.
+
+    async def _find(self, name, target, field, marker, key=lambda body: body):
+        status, body = await self.call(name, 'GET', target)
+        if status != 200:
+            return None
+        return next((item['id'] for item in key(json.loads(body)) if item.get(field) == marker), None)
+
+    async def _cycle(self, kind, payload, field):
+        marker = self.marker()
+        payload[field] = marker
+        status, _ = await self.call(f'POST /routes/{kind}', 'POST', f'/routes/{kind}', json_body=payload)
+        if status != 201:
+            return
+        id = await self._find('GET /routes/recent_transactions', '/routes/recent_transactions?limit=20',
+                              'description', marker, key=lambda body: body['transactions'])
+        if id is None:
+            return
+        payload['amount'] += 1
+        await self.call(f'PUT /routes/{kind}/<id>', 'PUT', f'/routes/{kind}/{id}', json_body=payload)
+        await self.call(f'DELETE /routes/{kind}/<id>', 'DELETE', f'/routes/{kind}/{id}')
+
+    async def income_cycle(self):
+        await self._cycle('income', {'amount': round(self.rng.uniform(10, 500), 2), 'source': 'Load test',
+                                     'date': TODAY.isoformat()}, 'description')
+
+    async def expense_cycle(self):
+        await self._cycle('expense', {'amount': round(self.rng.uniform(1, 100), 2), 'category': 'Food',
+                                      'date': TODAY.isoformat()}, 'description')
+
+    async def bulk_expenses(self):
+        rows = [{'amount': round(self.rng.uniform(1, 50), 2), 'category': 'Food', 'date': self.day(30),
+                 'description': self.marker()} for _ in range(10)]
+        await self.call('POST /routes/expense/bulk', 'POST', '/routes/expense/bulk', json_body=rows)
+
+    async def import_csv(self):
+        # The same statement every time: after the first upload every row is
+        # a duplicate, which is the common case for repeated imports.
+        statement = 'date,amount,description\n' + ''.join(
+            f'{(TODAY - timedelta(days=n)).isoformat()},-{n + 1}.50,Import {self.number} {n}\n' for n in range(20)
+        )
+        boundary = 'loadboundary'
+        body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="statement.csv"\r\n'
+                f'Content-Type: text/csv\r\n\r\n{statement}\r\n--{boundary}--\r\n').encode()
+        await self.call('POST /routes/import/csv', 'POST', '/routes/import/csv', body=body,
+                        headers={'Content-Type': f'multipart/form-data; boundary={boundary}'})
+
+    async def budget_cycle(self):
+        category = self.marker()
+        payload = {'category': category, 'limit': 100.0, 'year': 2099, 'month': self.rng.randint(1, 12)}
+        status, _ = await self.call('POST /routes/budget', 'POST', '/routes/budget', json_body=payload)
+        if status != 201:
+            return
+        id = await self._find('GET /routes/budget', '/routes/budget', 'category', category)
+        if id is None:
+            return
+        await self.call('GET /routes/budget/<id>', 'GET', f'/routes/budget/{id}')
+        payload['limit'] = 150.0
+        await self.call('PUT /routes/budget/<id>', 'PUT', f'/routes/budget/{id}', json_body=payload)
+        await self.call('DELETE /routes/budget/<id>', 'DELETE', f'/routes/budget/{id}')
+
+    async def goal_cycle(self):
+        name = self.marker()
+        payload = {'goal_name': name, 'target_amount': 5000.0, 'current_amount': 100.0,
+                   'target_date': (TODAY + timedelta(days=365)).isoformat()}
+        status, _ = await self.call('POST /routes/financial_goals', 'POST', '/routes/financial_goals',
+                                    json_body=payload)
+        if status != 201:
+            return
+        id = await self._find('GET /routes/financial_goals', '/routes/financial_goals', 'goal_name', name)
+        if id is None:
+            return
+        payload['current_amount'] = 200.0
+        await self.call('PUT /routes/financial_goals/<id>', 'PUT', f'/routes/financial_goals/{id}',
+                        json_body=payload)
+        await self.call('DELETE /routes/financial_goals/<id>', 'DELETE', f'/routes/financial_goals/{id}')
+
+
+READS = {
+    VirtualUser.transactions: 20, VirtualUser.recent_transactions: 10, VirtualUser.balance: 10,
+    VirtualUser.balance_at: 5, VirtualUser.balance_history: 3, VirtualUser.monthly_summary: 8,
+    VirtualUser.analytics: 2, VirtualUser.export: 1, VirtualUser.budgets: 5, VirtualUser.budget: 3,
+    VirtualUser.budget_status: 5, VirtualUser.financial_goals: 3, VirtualUser.projections: 2,
+}
+WRITES = {
+    VirtualUser.income_cycle: 3, VirtualUser.expense_cycle: 3, VirtualUser.bulk_expenses: 1,
+    VirtualUser.import_csv: 1, VirtualUser.budget_cycle: 1, VirtualUser.goal_cycle: 1,
+}
+
+
+async def run_user(user, actions, weights, deadline):
+    while time.perf_counter() < deadline:
+        await user.rng.choices(actions, weights)[0](user)
+    user.http.close()
+
+
+async def run(args):
+    login_recorder, recorder = Recorder(), Recorder()
+    users = [
+        VirtualUser(n, args.url, f'{args.prefix}{args.start + n % args.user_count}', args.password,
+                    login_recorder, random.Random(args.seed + n))
+        for n in range(args.users)
+    ]
+    started = time.perf_counter()
+    await asyncio.gather(*(user.login() for user in users))
+    login_seconds = time.perf_counter() - started
+
+    mix = dict(READS) if args.read_only else {**READS, **WRITES}
+    for user in users:
+        user.recorder = recorder
+    deadline = time.perf_counter() + args.duration
+    await asyncio.gather(*(run_user(user, list(mix), list(mix.values()), deadline) for user in users))
+
+    results = recorder.summary(args.duration)
+    results['endpoints'].update(login_recorder.summary(login_seconds)['endpoints'])
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def change(new, old):
+    if new is None or not old:
+        return ''
+    return f'{(new - old) / old * 100:+.0f}%'
+
+
+def report(results, baseline=None):
+    rows = [('TOTAL', results['total'])] + list(results['endpoints'].items())
+    before = {'TOTAL': baseline['total'], **baseline['endpoints']} if baseline else {}
+    header = f"{'endpoint':<40} {'reqs':>7} {'err':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    print(header + (f" {'Δreq/s':>7} {'Δp50':>6} {'Δp99':>6}" if baseline else ''))
+    fmt = lambda value: f'{value:.2f}' if value is not None else '-'
+    for name, stats in rows:
+        line = (f"{name:<40} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput']:>8.1f} "
+                f"{fmt(stats['p50_ms']):>8} {fmt(stats['p95_ms']):>8} {fmt(stats['p99_ms']):>8}")
+        if baseline and name in before:
+            old = before[name]
+            line += (f" {change(stats['throughput'], old['throughput']):>7} "
+                     f"{change(stats['p50_ms'], old['p50_ms']):>6} {change(stats['p99_ms'], old['p99_ms']):>6}")
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--users', type=int, default=20, help='virtual users, i.e. concurrent connections')
+    parser.add_argument('--user-count', type=int, default=None,
+                        help='seeded users to log in as (default: one per virtual user)')
+    parser.add_argument('--prefix', default='user', help='seeded username prefix, as for flask seed')
+    parser.add_argument('--start', type=int, default=0)
+    parser.add_argument('--password', default='password123')
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--read-only', action='store_true', help='skip the write cycles')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_load.json')
+    parser.add_argument('--baseline', default=None, help='earlier --output file to compare against')
+    args = parser.parse_args()
+    args.user_count = args.user_count or args.users
+
+    results = asyncio.run(run(args))
+    results['run'] = {
+        'finished_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        **{key: value for key, value in vars(args).items() if key not in ('password', 'output', 'baseline')},
+    }
+    with open(args.output, 'w') as output:
+        json.dump(results, output, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as previous:
+            baseline = json.load(previous)
+    report(results, baseline)
+    print(f'\nResults written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
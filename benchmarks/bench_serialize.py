@@ -0,0 +1,128 @@
+"""Compare response serialization with marshmallow + json against msgspec Structs.
+
+Run from the repository root:
+
+    python benchmarks/bench_serialize.py [--rows 10000] [--repeat 5]
+
+"load+encode" includes the query (ORM objects for marshmallow, Core rows for
+msgspec); "encode" times serialization of already-loaded results only.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+from config import Config
+from app import create_app, db
+
+
+class BenchConfig(Config):
+    SECRET_KEY = 'bench'
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+
+def seed(user_id, n_rows):
+    from models import Expense, Budget, FinancialGoal
+    rng = random.Random(n_rows)
+    first_day = date(2015, 1, 1)
+    db.session.execute(db.insert(Expense), [{
+        'amount': round(rng.uniform(1, 500), 2),
+        'category': rng.choice(['Food', 'Rent', 'Transport', 'Fun']),
+        'date': first_day + timedelta(days=rng.randrange(3650)),
+        'description': 'bench',
+        'user_id': user_id
+    } for _ in range(n_rows)])
+    db.session.execute(db.insert(Budget), [{
+        'category': f'Category {i}',
+        'limit': round(rng.uniform(100, 1000), 2),
+        'year': 2015 + i % 10,
+        'month': i % 12 + 1,
+        'user_id': user_id
+    } for i in range(n_rows)])
+    db.session.execute(db.insert(FinancialGoal), [{
+        'goal_name': f'Goal {i}',
+        'target_amount': round(rng.uniform(1000, 10000), 2),
+        'current_amount': round(rng.uniform(0, 1000), 2),
+        'target_date': first_day + timedelta(days=rng.randrange(3650)),
+        'user_id': user_id
+    } for i in range(n_rows)])
+    db.session.commit()
+
+
+def cases():
+    from models import Expense, Budget, FinancialGoal
+    from schemas import ExpenseSchema, BudgetSchema, FinancialGoalSchema
+    import serializers
+    return [
+        ('expense', Expense, ExpenseSchema, serializers.Expense,
+         select(Expense.id, Expense.date, Expense.amount, Expense.category, Expense.description)),
+        ('budget', Budget, BudgetSchema, serializers.Budget,
+         select(Budget.id, Budget.category, Budget.limit, Budget.year, Budget.month)),
+        ('goal', FinancialGoal, FinancialGoalSchema, serializers.FinancialGoal,
+         select(FinancialGoal.id, FinancialGoal.goal_name, FinancialGoal.target_amount,
+                FinancialGoal.current_amount, FinancialGoal.target_date)),
+    ]
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        from models import User
+        import serializers
+        db.create_all()
+        user = User(username='bench', email='bench@example.com', password='x')
+        db.session.add(user)
+        db.session.commit()
+        uid = user.id
+        seed(uid, args.rows)
+
+        print(f"{'model':>8} {'engine':>11} {'load+encode ms':>15} {'encode ms':>10} {'KiB':>8}")
+        for name, model, schema_class, struct, stmt in cases():
+            stmt = stmt.where(model.user_id == uid)
+
+            def marshmallow_load_encode():
+                return json.dumps(schema_class(many=True).dump(model.query.filter_by(user_id=uid).all()))
+
+            def msgspec_load_encode():
+                return serializers.encoder.encode([struct(*row) for row in db.session.execute(stmt)])
+
+            objects = model.query.filter_by(user_id=uid).all()
+            structs = [struct(*row) for row in db.session.execute(stmt)]
+            paths = (
+                ('marshmallow', marshmallow_load_encode,
+                 lambda: json.dumps(schema_class(many=True).dump(objects))),
+                ('msgspec', msgspec_load_encode,
+                 lambda: serializers.encoder.encode(structs)),
+            )
+            for engine, load_encode, encode in paths:
+                full = measure(load_encode, args.repeat)
+                encode_only = measure(encode, args.repeat)
+                kib = len(load_encode()) / 1024
+                print(f'{name:>8} {engine:>11} {full:>15.2f} {encode_only:>10.2f} {kib:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Per-request cost of the session backends: Flask-Session filesystem vs. sqlite vs. memory.
+
+Run from the repository root:
+
+    python benchmarks/bench_sessions.py [--requests 2000]
+
+"read" requests load an existing, unchanged session; "write" requests change it.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import request, session
+from config import Config
+from app import create_app
+
+BACKENDS = ['filesystem', 'sqlite', 'memory']
+
+
+def make_app(session_type, workdir):
+    class BenchConfig(Config):
+        SECRET_KEY = 'bench'
+        SQLALCHEMY_DATABASE_URI = 'sqlite://'
+        SESSION_TYPE = session_type
+        SESSION_FILE_DIR = os.path.join(workdir, 'flask_session')
+        SESSION_SQLITE_PATH = os.path.join(workdir, 'sessions.db')
+        SESSION_REFRESH_EACH_REQUEST = True
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        app = create_app(BenchConfig)
+
+    @app.route('/bench/session')
+    def bench_session():
+        if 'value' in request.args:
+            session['value'] = request.args['value']
+        return {'value': session.get('value')}
+
+    return app
+
+
+def timed(client, paths):
+    started = time.perf_counter()
+    for path in paths:
+        client.get(path)
+    return (time.perf_counter() - started) / len(paths) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'backend':>12} {'read us/req':>12} {'write us/req':>13}")
+    for backend in BACKENDS:
+        app = make_app(backend, tempfile.mkdtemp())
+        client = app.test_client()
+        client.get('/bench/session?value=start')
+        read = timed(client, ['/bench/session'] * args.requests)
+        write = timed(client, [f'/bench/session?value={i}' for i in range(args.requests)])
+        print(f'{backend:>12} {read:>12.1f} {write:>13.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Compare /balance and /monthly_summary aggregation in Python vs. in SQL.
+
+Run from the repository root:
+
+    python benchmarks/bench_summary.py [--sizes 1000,10000,100000] [--repeat 5]
+"""
+import argparse
+import calendar
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from app import create_app, db
+
+
+class BenchConfig(Config):
+    SECRET_KEY = 'bench'
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+
+def seed(user_id, n_rows):
+    from models import Income, Expense
+    import ledger
+    import rollup
+    rng = random.Random(n_rows)
+    first_day = date(2015, 1, 1)
+    for model, label_field, labels in ((Income, 'source', ['Salary', 'Freelance', 'Interest']),
+                                       (Expense, 'category', ['Food', 'Rent', 'Transport', 'Fun'])):
+        rows = [{
+            'amount': round(rng.uniform(1, 500), 2),
+            label_field: rng.choice(labels),
+            'date': first_day + timedelta(days=rng.randrange(3650)),
+            'description': '',
+            'user_id': user_id
+        } for _ in range(n_rows // 2)]
+        db.session.execute(db.insert(model), rows)
+    rollup.rebuild(user_id)
+    ledger.rebuild(user_id)
+    db.session.commit()
+
+
+def python_summary(user_id, year, month):
+    from models import Income, Expense
+    start = date(year, month, 1)
+    end = date(year, month, calendar.monthrange(year, month)[1])
+    balance = (sum(i.amount for i in Income.query.filter_by(user_id=user_id).all())
+               - sum(e.amount for e in Expense.query.filter_by(user_id=user_id).all()))
+    total_income = sum(i.amount for i in Income.query.filter_by(user_id=user_id)
+                       .filter(Income.date >= start, Income.date <= end).all())
+    total_expenses = sum(e.amount for e in Expense.query.filter_by(user_id=user_id)
+                         .filter(Expense.date >= start, Expense.date <= end).all())
+    return balance, total_income, total_expenses
+
+
+def sql_summary(user_id, year, month):
+    import aggregates
+    summary = aggregates.monthly_summary(user_id, year, month)
+    return aggregates.balance(user_id), summary['total_income'], summary['total_expenses']
+
+
+def measure(fn, repeat):
+    timings = []
+    peak = 0
+    for _ in range(repeat):
+        db.session.expunge_all()
+        tracemalloc.start()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.median(timings) * 1000, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        from models import User
+        db.create_all()
+        print(f"{'rows':>8} {'path':>7} {'median ms':>10} {'peak KiB':>10}")
+        for user_id, size in enumerate(int(s) for s in args.sizes.split(',')):
+            user = User(username=f'bench{user_id}', email=f'bench{user_id}@example.com', password='x')
+            db.session.add(user)
+            db.session.commit()
+            uid = user.id
+            seed(uid, size)
+            for name, fn in (('python', python_summary), ('sql', sql_summary)):
+                ms, kib = measure(lambda: fn(uid, 2020, 6), args.repeat)
+                print(f'{size:>8} {name:>7} {ms:>10.2f} {kib:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Keep-alive HTTP/1.1 client and latency recorder shared by the load benchmarks.
+
+Plain asyncio streams, so the benchmarks need nothing beyond the app's own
+requirements and the client adds little per-request overhead of its own.
+"""
+import asyncio
+import json
+import math
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+
+class Connection:
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.reader = self.writer = None
+
+    async def request(self, method, target, headers=None, body=b'', json_body=None):
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            headers = {**(headers or {}), 'Content-Type': 'application/json'}
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f'{method} {target} HTTP/1.1', f'Host: {self.host}:{self.port}', f'Content-Length: {len(body)}']
+        lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + body)
+        try:
+            status, close, payload = await self._read_response(method)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self.close()
+            raise
+        if close:
+            self.close()
+        return status, payload
+
+    async def _read_response(self, method):
+        head = (await self.reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        status = int(head[0].split()[1])
+        headers = {}
+        for line in head[1:]:
+            if ': ' in line:
+                name, value = line.split(': ', 1)
+                headers[name.lower()] = value
+        close = headers.get('connection', '').lower() == 'close'
+        if method == 'HEAD' or status in (204, 304):
+            return status, close, b''
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if not size:
+                    break
+                chunks.append(chunk[:-2])
+            return status, close, b''.join(chunks)
+        if 'content-length' in headers:
+            return status, close, await self.reader.readexactly(int(headers['content-length']))
+        return status, True, await self.reader.read()
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def percentile(ordered, p):
+    # Nearest rank on an already sorted list.
+    if not ordered:
+        return None
+    return ordered[max(math.ceil(p / 100 * len(ordered)), 1) - 1]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def timed(self, name, call, ok=(200, 201, 207, 304)):
+        started = time.perf_counter()
+        try:
+            status, body = await call
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            status, body = None, b''
+        self.latencies[name].append(time.perf_counter() - started)
+        if status not in ok:
+            self.errors[name] += 1
+        return status, body
+
+    def summary(self, duration):
+        def stats(samples, errors):
+            ordered = sorted(samples)
+            ms = lambda value: round(value * 1000, 2) if value is not None else None
+            return {
+                'requests': len(ordered),
+                'errors': errors,
+                'throughput': round(len(ordered) / duration, 2),
+                'mean_ms': ms(sum(ordered) / len(ordered)) if ordered else None,
+                'p50_ms': ms(percentile(ordered, 50)),
+                'p95_ms': ms(percentile(ordered, 95)),
+                'p99_ms': ms(percentile(ordered, 99)),
+                'max_ms': ms(ordered[-1]) if ordered else None,
+            }
+        everything = [value for samples in self.latencies.values() for value in samples]
+        return {
+            'total': stats(everything, sum(self.errors.values())),
+            'endpoints': {name: stats(samples, self.errors[name]) for name, samples in sorted(self.latencies.items())},
+        }
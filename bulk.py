@@ -0,0 +1,86 @@
+from sqlalchemy import delete, func, select, update
+from app import db
+import ledger
+import rollup
+import versions
+
+LABELS = {'income': 'source', 'expense': 'category'}
+
+
+def _where(kind, user_id, filters):
+    model, label = rollup.KINDS[kind]
+    clauses = [model.user_id == user_id]
+    if 'start_date' in filters:
+        clauses.append(model.date >= filters['start_date'])
+    if 'end_date' in filters:
+        clauses.append(model.date <= filters['end_date'])
+    if LABELS[kind] in filters:
+        clauses.append(label == filters[LABELS[kind]])
+    if 'min_amount' in filters:
+        clauses.append(model.amount >= filters['min_amount'])
+    if 'max_amount' in filters:
+        clauses.append(model.amount <= filters['max_amount'])
+    return clauses
+
+
+# The matched rows as (date, label, total, count): all the rollup and the
+# ledger need to remove them and add them back changed.
+def _groups(kind, where):
+    model, label = rollup.KINDS[kind]
+    return db.session.execute(
+        select(model.date, label, func.sum(model.amount), func.count())
+        .where(*where)
+        .group_by(model.date, label)
+    ).all()
+
+
+def _track(kind, user_id, groups, sign):
+    rollup.apply([(user_id, day.year, day.month, kind, label, sign * total, sign * count)
+                  for day, label, total, count in groups])
+    ledger.apply([(user_id, day, sign * rollup.direction(kind) * total) for day, label, total, count in groups])
+
+
+def _reconcile(kind, user_id, groups, matched, changed=None):
+    if matched != sum(count for *_, count in groups):
+        # A concurrent write changed the match between the read and the
+        # statement, so the deltas would be off; recompute from the rows.
+        rollup.rebuild(user_id)
+        ledger.rebuild(user_id)
+        return
+    _track(kind, user_id, groups, -1)
+    if changed is not None:
+        _track(kind, user_id, changed, 1)
+
+
+def update_matching(kind, user_id, filters, changes):
+    model, _ = rollup.KINDS[kind]
+    where = _where(kind, user_id, filters)
+    groups = _groups(kind, where)
+    if not groups:
+        return 0
+    matched = db.session.execute(
+        update(model).where(*where).values(**changes).execution_options(synchronize_session=False)
+    ).rowcount
+    if changes.keys() & {'date', 'amount', LABELS[kind]}:
+        changed = [
+            (changes.get('date', day), changes.get(LABELS[kind], label),
+             changes['amount'] * count if 'amount' in changes else total, count)
+            for day, label, total, count in groups
+        ]
+        _reconcile(kind, user_id, groups, matched, changed)
+    versions.touch(user_id)
+    return matched
+
+
+def delete_matching(kind, user_id, filters):
+    model, _ = rollup.KINDS[kind]
+    where = _where(kind, user_id, filters)
+    groups = _groups(kind, where)
+    if not groups:
+        return 0
+    matched = db.session.execute(
+        delete(model).where(*where).execution_options(synchronize_session=False)
+    ).rowcount
+    _reconcile(kind, user_id, groups, matched)
+    versions.touch(user_id)
+    return matched
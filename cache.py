@@ -0,0 +1,205 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, make_response, request
+from flask_jwt_extended import get_jwt_identity
+
+
+class MemoryBackend:
+    # Per-process LRU with TTL. Version counters live outside the LRU so
+    # they are never evicted.
+    def __init__(self, max_entries=10000, default_timeout=300):
+        self.max_entries = max_entries
+        self.default_timeout = default_timeout
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires and expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        timeout = self.default_timeout if timeout is None else timeout
+        expires = time.monotonic() + timeout if timeout else 0
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_counter(self, key):
+        return self._counters.get(key)
+
+    def add_counter(self, key, value):
+        with self._lock:
+            return self._counters.setdefault(key, value)
+
+    def inc(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+class CachelibBackend:
+    # A cachelib cache. RedisCache is shared by every worker and increments
+    # atomically, so invalidations are seen everywhere. FileSystemCache's inc
+    # reads, adds and writes the file with no lock between processes: two
+    # workers bumping at once can land on the same version and keep serving
+    # stale entries, so use it with a single worker process only.
+    def __init__(self, cache):
+        self.cache = cache
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value, timeout=None):
+        self.cache.set(key, value, timeout=timeout)
+
+    def get_counter(self, key):
+        return self.cache.get(key)
+
+    def add_counter(self, key, value):
+        self.cache.add(key, value, timeout=0)
+        return self.cache.get(key)
+
+    def inc(self, key):
+        return self.cache.inc(key)
+
+    def clear(self):
+        self.cache.clear()
+
+
+def _make_backend(config):
+    cache_type = config['CACHE_TYPE']
+    timeout = config['CACHE_DEFAULT_TIMEOUT']
+    if cache_type == 'memory':
+        return MemoryBackend(config['CACHE_MAX_ENTRIES'], timeout)
+    if cache_type == 'redis':
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_TYPE 'redis' needs the redis package installed") from None
+        from cachelib import RedisCache
+        client = redis.Redis.from_url(config['CACHE_REDIS_URL'])
+        return CachelibBackend(RedisCache(client, default_timeout=timeout, key_prefix='budget:'))
+    if cache_type == 'filesystem':
+        from cachelib import FileSystemCache
+        return CachelibBackend(FileSystemCache(config['CACHE_DIR'], threshold=config['CACHE_MAX_ENTRIES'],
+                                               default_timeout=timeout))
+    if cache_type == 'null':
+        return None
+    raise RuntimeError(f'Unknown CACHE_TYPE {cache_type!r}')
+
+
+class ResponseCache:
+    def __init__(self, app=None):
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CACHE_TYPE', 'null')
+        app.config.setdefault('CACHE_DEFAULT_TIMEOUT', 300)
+        app.config.setdefault('CACHE_MAX_ENTRIES', 10000)
+        app.config.setdefault('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+        app.config.setdefault('CACHE_DIR', 'cache')
+        app.extensions['response_cache'] = _make_backend(app.config)
+
+    def _backend(self):
+        return current_app.extensions.get('response_cache')
+
+    def version(self, user_id):
+        backend = self._backend()
+        if backend is None:
+            return 0
+        key = f'version:{user_id}'
+        version = backend.get_counter(key)
+        if version is None:
+            # Start from the clock rather than 0 so a lost counter can never
+            # line up with entries cached under an earlier version.
+            version = backend.add_counter(key, time.time_ns() // 1000)
+        return version
+
+    def bump(self, user_id):
+        backend = self._backend()
+        if backend is not None:
+            self.version(user_id)
+            backend.inc(f'version:{user_id}')
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def memoize(self, key, compute):
+        # For computed results whose key already carries the user's data
+        # version, so a write makes old entries unreachable.
+        backend = self._backend()
+        if backend is None:
+            return compute()
+        value = backend.get(f'memo:{key}')
+        self._count(value is not None)
+        if value is None:
+            value = compute()
+            backend.set(f'memo:{key}', value)
+        return value
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def cached(self, view):
+        @wraps(view)
+        def decorated_function(*args, **kwargs):
+            backend = self._backend()
+            if backend is None or request.method != 'GET':
+                return view(*args, **kwargs)
+
+            user_id = get_jwt_identity()
+            query = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+            key = f'response:{user_id}:{self.version(user_id)}:{request.endpoint}:{sorted(kwargs.items())}:{query}'
+
+            entry = backend.get(key)
+            if entry is not None:
+                self._count(True)
+                body, status, mimetype = entry
+                response = current_app.response_class(body, status=status, mimetype=mimetype)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            self._count(False)
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                backend.set(key, (response.get_data(), response.status_code, response.mimetype))
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return decorated_function
+
+    def invalidate_after_write(self, response):
+        if request.method in ('POST', 'PUT', 'PATCH', 'DELETE'):
+            try:
+                user_id = get_jwt_identity()
+            except RuntimeError:
+                return response
+            if user_id is not None:
+                self.bump(user_id)
+        return response
@@ -4,6 +4,31 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY')
     SQLALCHEMY_DATABASE_URI =  os.getenv('DATABASE_URL') #'sqlite:///site.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SESSION_TYPE = 'filesystem'
+    SESSION_TYPE = os.getenv('SESSION_TYPE', 'sqlite')  # 'sqlite', 'memory', or any Flask-Session type
+    SESSION_SQLITE_PATH = os.getenv('SESSION_SQLITE_PATH')  # defaults to instance/sessions.db
+    SESSION_SWEEP_INTERVAL = int(os.getenv('SESSION_SWEEP_INTERVAL', 60))
     SESSION_PERMANENT = False
     SESSION_USE_SIGNER = True
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'null')  # 'memory', 'redis', 'filesystem' or 'null'
+    CACHE_DEFAULT_TIMEOUT = int(os.getenv('CACHE_DEFAULT_TIMEOUT', 300))
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))  # 0 hashes inline
+    PASSWORD_HASH_MAX_CONCURRENCY = int(os.getenv('PASSWORD_HASH_MAX_CONCURRENCY', 0)) or None
+    ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL')  # defaults to DATABASE_URL with aiosqlite/asyncpg
+    ASGI_THREADS = int(os.getenv('ASGI_THREADS', 16))  # threads for requests handed to Flask under ASGI
+    REPLICA_DATABASE_URL = os.getenv('REPLICA_DATABASE_URL')  # GET /routes/* reads go here when set
+    READ_YOUR_WRITES_SECONDS = float(os.getenv('READ_YOUR_WRITES_SECONDS', 5))  # primary reads after a user's write
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))  # per engine, per worker process
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # seconds; -1 never recycles
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))  # seconds to wait for a free connection
+    SLOW_QUERY_SECONDS = float(os.getenv('SLOW_QUERY_SECONDS', 0.5))  # log statements slower than this; 0 disables
+    SLOW_REQUEST_SECONDS = float(os.getenv('SLOW_REQUEST_SECONDS', 2))  # log requests slower than this; 0 disables
+    BATCH_MAX_OPERATIONS = int(os.getenv('BATCH_MAX_OPERATIONS', 100))
+    PROFILE_DIR = os.getenv('PROFILE_DIR')  # profiling is off unless set
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))  # fraction of requests to profile
+    PROFILE_ENDPOINTS = os.getenv('PROFILE_ENDPOINTS', '')  # comma-separated endpoint names or route rules, always profiled
+    PROFILE_TOKEN = os.getenv('PROFILE_TOKEN')  # requests sending it in PROFILE_HEADER are profiled
+    PROFILE_HEADER = os.getenv('PROFILE_HEADER', 'X-Profile')
@@ -0,0 +1,25 @@
+from sqlalchemy import insert as generic_insert
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+
+_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+def insert(table):
+    # Dialect-specific INSERT so callers can use ON CONFLICT where the backend supports it.
+    return _INSERTS.get(db.session.get_bind().dialect.name, generic_insert)(table)
+
+
+def supports_on_conflict():
+    return db.session.get_bind().dialect.name in _INSERTS
+
+
+def begin_for_savepoints():
+    # pysqlite only opens a transaction before DML, so a SAVEPOINT issued
+    # first would start a transaction of its own and its RELEASE commit it.
+    connection = db.session.connection()
+    if connection.dialect.driver == 'pysqlite' and not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql('BEGIN')
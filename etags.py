@@ -0,0 +1,32 @@
+import hashlib
+from functools import wraps
+from flask import make_response, request
+from flask_jwt_extended import get_jwt_identity
+import versions
+
+
+def make_etag(user_id, version, full_path):
+    # The same user, data version and URL always render the same body.
+    digest = hashlib.sha1(full_path.encode()).hexdigest()[:16]
+    return f'{user_id}-{version}-{digest}'
+
+
+def conditional(view):
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        user_id = get_jwt_identity()
+        version = versions.current(user_id)
+        if version is None:
+            return view(*args, **kwargs)
+
+        etag = make_etag(user_id, version, request.full_path)
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return decorated_function
@@ -0,0 +1,49 @@
+import csv
+import io
+from itertools import islice
+import serializers
+
+BATCH_SIZE = 1000
+CSV_COLUMNS = ['type', 'id', 'date', 'amount', 'source', 'category', 'description']
+
+
+def _batched(lines, batch_size):
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= batch_size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def ndjson(items, batch_size=BATCH_SIZE):
+    items = iter(items)
+    while batch := list(islice(items, batch_size)):
+        yield serializers.encoder.encode_lines(batch)
+
+
+def _csv_lines(items):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(CSV_COLUMNS)
+    for item in items:
+        writer.writerow([item.__struct_config__.tag, item.id, item.date, item.amount,
+                         getattr(item, 'source', ''), getattr(item, 'category', ''), item.description])
+        yield out.getvalue()
+        out.seek(0)
+        out.truncate()
+    # The header alone for an empty export.
+    if out.tell():
+        yield out.getvalue()
+
+
+def csv_rows(items, batch_size=BATCH_SIZE):
+    return _batched(_csv_lines(items), batch_size)
+
+
+FORMATS = {
+    'ndjson': (ndjson, 'application/x-ndjson', 'transactions.ndjson'),
+    'csv': (csv_rows, 'text/csv', 'transactions.csv'),
+}
@@ -0,0 +1,121 @@
+import base64
+import binascii
+from datetime import date, datetime
+from heapq import merge
+from itertools import islice
+from sqlalchemy import select, tuple_
+from app import db
+from models import Income, Expense
+import serializers
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+# Feed order is (date, id, rank) descending; rank breaks ties between an
+# income and an expense that share both date and id.
+SOURCES = {
+    'income': (Income, Income.source, serializers.Income, 1),
+    'expense': (Expense, Expense.category, serializers.Expense, 0),
+}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(day, kind, id):
+    raw = f'{day.isoformat()}:{kind}:{id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        day, kind, id = raw.split(':')
+        if kind not in SOURCES:
+            raise ValueError(kind)
+        return date.fromisoformat(day), kind, int(id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise InvalidCursor(cursor)
+
+
+def _select(kind, user_id, start_date=None, end_date=None, category=None, after=None):
+    model, label, _, rank = SOURCES[kind]
+    stmt = (
+        select(model.id, model.date, model.amount, label, model.description)
+        .where(model.user_id == user_id)
+    )
+    if start_date is not None:
+        stmt = stmt.where(model.date >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(model.date <= end_date)
+    if category is not None and kind == 'expense':
+        stmt = stmt.where(Expense.category == category)
+    if after is not None:
+        after_date, after_kind, after_id = after
+        position = tuple_(model.date, model.id)
+        if rank < SOURCES[after_kind][3]:
+            stmt = stmt.where(position <= tuple_(after_date, after_id))
+        else:
+            stmt = stmt.where(position < tuple_(after_date, after_id))
+    return stmt.order_by(model.date.desc(), model.id.desc())
+
+
+def _rows(kind, result):
+    _, _, struct, rank = SOURCES[kind]
+    for row in result:
+        yield (row.date, row.id, rank), struct(*row)
+
+
+def iter_feed(user_id, limit=None, yield_per=None, **filters):
+    streams = []
+    for kind in SOURCES:
+        stmt = _select(kind, user_id, **filters)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        if yield_per is not None:
+            stmt = stmt.execution_options(yield_per=yield_per)
+        streams.append(_rows(kind, db.session.execute(stmt)))
+    for _, item in merge(*streams, key=lambda row: row[0], reverse=True):
+        yield item
+
+
+def parse_limit(args, default):
+    limit = args.get('limit', default=default, type=int)
+    if limit is None or limit < 1:
+        return None
+    return min(limit, MAX_LIMIT)
+
+
+def parse_filters(args):
+    filters = {'start_date': None, 'end_date': None, 'category': args.get('category') or None}
+    for name in ('start_date', 'end_date'):
+        value = args.get(name)
+        if value:
+            filters[name] = datetime.strptime(value, '%Y-%m-%d').date()
+    return filters
+
+
+# A page is one bounded select per source, so callers with their own
+# connection (the async API) can run them and hand the rows to page_from.
+def page_selects(user_id, limit=DEFAULT_LIMIT, after=None, **filters):
+    if after is not None:
+        after = decode_cursor(after)
+    return {kind: _select(kind, user_id, after=after, **filters).limit(limit + 1) for kind in SOURCES}
+
+
+def page_from(results, limit):
+    streams = [_rows(kind, rows) for kind, rows in results.items()]
+    items = [item for _, item in islice(merge(*streams, key=lambda row: row[0], reverse=True), limit + 1)]
+    more = len(items) > limit
+    items = items[:limit]
+    last = items[-1] if items else None
+    return {
+        'transactions': items,
+        'next_cursor': encode_cursor(last.date, last.__struct_config__.tag, last.id) if more else None
+    }
+
+
+def page(user_id, limit=DEFAULT_LIMIT, after=None, **filters):
+    selects = page_selects(user_id, limit, after, **filters)
+    return page_from({kind: db.session.execute(stmt) for kind, stmt in selects.items()}, limit)
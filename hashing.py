@@ -0,0 +1,110 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+class HashingBusy(Exception):
+    pass
+
+
+def _generate(password, method, submitted):
+    started = time.time()
+    return generate_password_hash(password, method=method), started - submitted, time.time() - started
+
+
+def _check(pwhash, password, submitted):
+    started = time.time()
+    return check_password_hash(pwhash, password), started - submitted, time.time() - started
+
+
+def normalise_method(method):
+    # Spell out werkzeug's defaults so a stored hash prefix can be compared directly.
+    parts = method.split(':')
+    if parts[0] == 'pbkdf2':
+        hash_name = parts[1] if len(parts) > 1 else 'sha256'
+        iterations = parts[2] if len(parts) > 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{hash_name}:{iterations}'
+    if parts[0] == 'scrypt':
+        n, r, p = (parts[1:] + ['32768', '8', '1'][len(parts) - 1:])[:3]
+        return f'scrypt:{n}:{r}:{p}'
+    return method
+
+
+class PasswordHasher:
+    def __init__(self, app=None):
+        self.method = None
+        self.workers = 0
+        self.max_concurrency = 1
+        self._executor = None
+        self._executor_pid = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._stats = {'jobs': 0, 'rejected': 0, 'in_flight': 0,
+                       'queue_seconds_total': 0.0, 'queue_seconds_max': 0.0, 'hash_seconds_total': 0.0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PASSWORD_HASH_METHOD', 'pbkdf2:sha256')
+        app.config.setdefault('PASSWORD_HASH_WORKERS', os.cpu_count() or 1)
+        app.config.setdefault('PASSWORD_HASH_MAX_CONCURRENCY', None)
+        self.method = normalise_method(app.config['PASSWORD_HASH_METHOD'])
+        self.workers = app.config['PASSWORD_HASH_WORKERS']
+        self.max_concurrency = app.config['PASSWORD_HASH_MAX_CONCURRENCY'] or max(self.workers, 1) * 2
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        app.extensions['password_hasher'] = self
+
+    def _pool(self):
+        # Created lazily, and again after a fork, so each gunicorn worker owns its pool.
+        # Children never fork from a threaded worker mid-request.
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context(method)
+                    )
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def _run(self, fn, *args):
+        submitted = time.time()
+        # Over max_concurrency the caller gets a 503 at once rather than
+        # holding its request thread while it waits for a slot.
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats['rejected'] += 1
+            raise HashingBusy()
+        try:
+            with self._lock:
+                self._stats['in_flight'] += 1
+            if self.workers:
+                result, queued, took = self._pool().submit(fn, *args, submitted).result()
+            else:
+                result, queued, took = fn(*args, submitted)
+        finally:
+            self._slots.release()
+            with self._lock:
+                self._stats['in_flight'] -= 1
+        with self._lock:
+            self._stats['jobs'] += 1
+            self._stats['queue_seconds_total'] += queued
+            self._stats['queue_seconds_max'] = max(self._stats['queue_seconds_max'], queued)
+            self._stats['hash_seconds_total'] += took
+        return result
+
+    def hash(self, password):
+        return self._run(_generate, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run(_check, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        return pwhash.split('$', 1)[0] != self.method
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, workers=self.workers, max_concurrency=self.max_concurrency)
@@ -0,0 +1,158 @@
+import codecs
+import csv
+import hashlib
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import select
+from app import db
+from models import Income, Expense
+import dialects
+import rollup
+import versions
+
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+DEFAULT_MAPPING = {
+    'date_column': 'date',
+    'amount_column': 'amount',
+    'description_column': 'description',
+    'category_column': 'category',
+    'date_format': '%Y-%m-%d',
+}
+
+TARGETS = {
+    'income': (Income, 'source', 'Bank import'),
+    'expense': (Expense, 'category', 'Uncategorized'),
+}
+
+
+def fingerprint(user_id, kind, day, amount, description, occurrence):
+    raw = f'{user_id}|{kind}|{day.isoformat()}|{amount:.2f}|{description}|{occurrence}'
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class UnreadableFile(Exception):
+    def __init__(self, line, message):
+        super().__init__(line, message)
+        self.line = line
+        self.message = message
+
+
+# Yields (line, kind, row), or (line, None, message) for unreadable records.
+# Identical rows on the same day (two coffees at the same price) get an
+# occurrence number so each keeps its own fingerprint. Only the current day's
+# occurrences are counted, so memory does not grow with the file; that needs
+# each day's rows together, as in any statement sorted by date (either way).
+# A row for a day that has already ended is rejected rather than given a
+# number that could collide. Raises UnreadableFile, with the first line not
+# read, when the file is not UTF-8 or not CSV.
+def parse_rows(user_id, stream, mapping):
+    # A codecs reader rather than io.TextIOWrapper, which before Python 3.11
+    # cannot wrap the SpooledTemporaryFile that large uploads arrive in.
+    reader = csv.DictReader(codecs.getreader('utf-8-sig')(stream))
+    current_day, seen, ended = None, Counter(), set()
+    records = iter(reader)
+    while True:
+        try:
+            record = next(records)
+        except StopIteration:
+            return
+        except UnicodeDecodeError:
+            raise UnreadableFile(reader.line_num + 1, 'The file must be UTF-8 encoded CSV.') from None
+        except csv.Error as e:
+            raise UnreadableFile(reader.line_num + 1, f'Malformed CSV: {e}.') from None
+        line = reader.line_num
+        try:
+            day = datetime.strptime(record[mapping['date_column']].strip(), mapping['date_format']).date()
+            amount = float(record[mapping['amount_column']].replace(',', '').strip())
+        except (KeyError, AttributeError, ValueError):
+            yield line, None, 'Unreadable date or amount.'
+            continue
+
+        if day != current_day:
+            if day in ended:
+                yield line, None, f'Rows for {day.isoformat()} are not together; sort the statement by date.'
+                continue
+            if current_day is not None:
+                ended.add(current_day)
+            current_day = day
+            seen.clear()
+
+        description = (record.get(mapping['description_column']) or '').strip()[:255]
+        label = (record.get(mapping['category_column']) or '').strip()[:100]
+        kind = 'income' if amount > 0 else 'expense'
+        amount = abs(amount)
+
+        key = (kind, amount, description)
+        occurrence = seen[key]
+        seen[key] += 1
+
+        _, label_field, default_label = TARGETS[kind]
+        yield line, kind, {
+            'amount': amount,
+            label_field: label or default_label,
+            'date': day,
+            'description': description,
+            'user_id': user_id,
+            'fingerprint': fingerprint(user_id, kind, day, amount, description, occurrence),
+        }
+
+
+def _insert_new(kind, rows):
+    model, label_field, _ = TARGETS[kind]
+    table = model.__table__
+
+    if dialects.supports_on_conflict():
+        stmt = (
+            dialects.insert(table)
+            .on_conflict_do_nothing(index_elements=['fingerprint'])
+            .returning(table.c.amount, table.c[label_field], table.c.date, table.c.user_id)
+        )
+        inserted = [row._asdict() for row in db.session.execute(stmt, rows)]
+    else:
+        existing = set(db.session.scalars(
+            select(table.c.fingerprint).where(table.c.fingerprint.in_([row['fingerprint'] for row in rows]))
+        ))
+        inserted = [row for row in rows if row['fingerprint'] not in existing]
+        if inserted:
+            db.session.execute(table.insert(), inserted)
+
+    rollup.track_rows(kind, inserted)
+    return len(inserted)
+
+
+def import_csv(user_id, stream, mapping=None, chunk_size=CHUNK_SIZE):
+    mapping = dict(DEFAULT_MAPPING, **(mapping or {}))
+    summary = {'imported': {'income': 0, 'expense': 0}, 'duplicates': 0, 'rejected': 0, 'errors': []}
+    pending = {'income': [], 'expense': []}
+
+    def flush(kind):
+        rows = pending[kind]
+        if rows:
+            count = _insert_new(kind, rows)
+            if count:
+                versions.touch(user_id)
+            db.session.commit()
+            summary['imported'][kind] += count
+            summary['duplicates'] += len(rows) - count
+            pending[kind] = []
+
+    try:
+        for line, kind, row in parse_rows(user_id, stream, mapping):
+            if kind is None:
+                summary['rejected'] += 1
+                if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                    summary['errors'].append({'line': line, 'message': row})
+                continue
+            pending[kind].append(row)
+            if len(pending[kind]) >= chunk_size:
+                flush(kind)
+    except UnreadableFile as e:
+        # Earlier chunks are already committed, so keep the rows read before
+        # the bad line too and say where the import stopped.
+        summary['stopped'] = {'line': e.line, 'message': e.message}
+
+    for kind in TARGETS:
+        flush(kind)
+    return summary
@@ -0,0 +1,44 @@
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from models import Expense
+from schemas import expense_validator
+import rollup
+import versions
+
+CHUNK_SIZE = 1000
+
+
+def validate_batch(rows):
+    valid, errors = expense_validator.load_many(rows)
+    indexes = sorted(valid)
+    return [valid[index] for index in indexes], indexes, errors
+
+
+def ingest_expenses(user_id, rows, chunk_size=CHUNK_SIZE):
+    valid, valid_indexes, errors = validate_batch(rows)
+
+    inserted = 0
+    for offset in range(0, len(valid), chunk_size):
+        chunk = [
+            {
+                'amount': row['amount'],
+                'category': row['category'],
+                'date': row['date'],
+                'description': row.get('description', ''),
+                'user_id': user_id
+            } for row in valid[offset:offset + chunk_size]
+        ]
+        try:
+            db.session.execute(insert(Expense), chunk)
+            rollup.track_rows('expense', chunk)
+            versions.touch(user_id)
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            for index in valid_indexes[offset:offset + chunk_size]:
+                errors[index] = {'_schema': ['Could not be stored.']}
+            continue
+        inserted += len(chunk)
+
+    return inserted, errors
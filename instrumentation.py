@@ -0,0 +1,126 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def cumulative(self):
+        # (upper bound, observations <= bound) pairs ending with +Inf, as
+        # Prometheus histograms expect.
+        running = 0
+        for bound, count in zip([*self.bounds, float('inf')], self.counts):
+            running += count
+            yield bound, running
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.requests = defaultdict(int)  # by (method, status)
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_seconds = Histogram(LATENCY_BUCKETS)
+        self.response_size = Histogram(SIZE_BUCKETS)
+
+
+class RequestMetrics:
+    # Per-endpoint latency, SQL statement count, database time and response
+    # size, kept per process. Statements are counted through engine events,
+    # so an N+1 pattern shows up as a jump in the endpoint's query histogram.
+    def __init__(self, app=None):
+        self.endpoints = defaultdict(EndpointMetrics)
+        self.slow_queries = 0
+        self.slow_requests = 0
+        self._lock = threading.Lock()
+        self._logger = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SLOW_QUERY_SECONDS', 0.5)
+        app.config.setdefault('SLOW_REQUEST_SECONDS', 2.0)
+        self._slow_query = app.config['SLOW_QUERY_SECONDS']
+        self._slow_request = app.config['SLOW_REQUEST_SECONDS']
+        self._logger = app.logger
+        app.before_request(self._start)
+        app.after_request(self._note_response)
+        # Teardown also runs when the view raised, so errors are counted too.
+        app.teardown_request(self._finish)
+        if not event.contains(Engine, 'before_cursor_execute', self._before_execute):
+            event.listen(Engine, 'before_cursor_execute', self._before_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_execute)
+            event.listen(Engine, 'handle_error', self._failed_execute)
+        app.extensions['request_metrics'] = self
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        took = time.perf_counter() - conn.info['query_started'].pop()
+        if has_request_context() and '_metrics_queries' in g:
+            g._metrics_queries += 1
+            g._metrics_db_seconds += took
+        if self._slow_query and took >= self._slow_query:
+            with self._lock:
+                self.slow_queries += 1
+            endpoint = request.endpoint if has_request_context() else None
+            self._logger.warning('Slow query (%.3fs, %s): %s', took, endpoint or 'no request', ' '.join(statement.split()))
+
+    def _failed_execute(self, context):
+        # A statement that raised never reaches after_cursor_execute.
+        if context.connection is not None:
+            started = context.connection.info.get('query_started')
+            if started:
+                started.pop()
+
+    def _start(self):
+        # The start time lives on the request, not g: a /batch operation's
+        # nested request context shares g and runs its own teardown.
+        request.environ['app.metrics_started'] = time.perf_counter()
+        g._metrics_queries = 0
+        g._metrics_db_seconds = 0.0
+
+    def _note_response(self, response):
+        request.environ['app.metrics_response'] = (response.status_code, response.calculate_content_length())
+        return response
+
+    def _finish(self, exc):
+        started = request.environ.pop('app.metrics_started', None)
+        if started is None:
+            return
+        took = time.perf_counter() - started
+        # No response was noted when the request ended in an exception.
+        status, size = request.environ.pop('app.metrics_response', (500, None))
+        # The route template, not the URL, so ids do not multiply the series.
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        queries, db_seconds = g.pop('_metrics_queries', 0), g.pop('_metrics_db_seconds', 0.0)
+        with self._lock:
+            metrics = self.endpoints[endpoint]
+            metrics.requests[(request.method, status)] += 1
+            metrics.latency.observe(took)
+            metrics.queries.observe(queries)
+            metrics.db_seconds.observe(db_seconds)
+            if size is not None:
+                metrics.response_size.observe(size)
+            slow = self._slow_request and took >= self._slow_request
+            if slow:
+                self.slow_requests += 1
+        if slow:
+            self._logger.warning('Slow request (%.3fs, %d queries, %.3fs in the database): %s %s',
+                                 took, queries, db_seconds, request.method, request.full_path)
@@ -0,0 +1,220 @@
+import bisect
+import click
+import math
+from collections import defaultdict
+from itertools import accumulate
+from flask.cli import AppGroup
+from sqlalchemy import bindparam, delete, func, insert, select, union_all, update
+from app import db
+from models import Income, Expense, DailyBalance
+import dialects
+import serializers
+
+ledger_cli = AppGroup('ledger', help='Maintain the daily running-balance ledger.')
+
+table = DailyBalance.__table__
+
+
+def balance_select(user_id, day=None):
+    # End-of-day balance on `day` (latest if None): one indexed lookup.
+    stmt = select(table.c.balance).where(table.c.user_id == user_id)
+    if day is not None:
+        stmt = stmt.where(table.c.date <= day)
+    return stmt.order_by(table.c.date.desc()).limit(1)
+
+
+def balance_at(user_id, day=None):
+    balance = db.session.execute(balance_select(user_id, day)).scalar()
+    return balance if balance is not None else 0.0
+
+
+def history_select(user_id, start=None, end=None):
+    # One range scan. The range starts at the last entry on or before `start`,
+    # reported as of `start`, so the series opens with the carried-in balance.
+    stmt = select(table.c.date, table.c.balance).where(table.c.user_id == user_id)
+    if start is not None:
+        anchor = (
+            select(func.max(table.c.date))
+            .where(table.c.user_id == user_id, table.c.date <= start)
+            .scalar_subquery()
+        )
+        stmt = stmt.where(table.c.date >= func.coalesce(anchor, start))
+    if end is not None:
+        stmt = stmt.where(table.c.date <= end)
+    return stmt.order_by(table.c.date)
+
+
+def history_from(rows, start=None):
+    return [
+        serializers.BalancePoint(day if start is None or day > start else start, balance)
+        for day, balance in rows
+    ]
+
+
+def history(user_id, start=None, end=None):
+    return history_from(db.session.execute(history_select(user_id, start, end)), start)
+
+
+# deltas are (user_id, day, amount), income positive and expenses negative.
+def apply(deltas):
+    merged = defaultdict(dict)
+    for user_id, day, amount in deltas:
+        merged[user_id][day] = merged[user_id].get(day, 0.0) + amount
+    for user_id, changes in merged.items():
+        changes = {day: amount for day, amount in changes.items() if amount}
+        if changes:
+            _apply_user(user_id, changes)
+
+
+def _insert(rows):
+    stmt = dialects.insert(table)
+    if dialects.supports_on_conflict():
+        stmt = stmt.on_conflict_do_nothing(index_elements=['user_id', 'date'])
+    db.session.execute(stmt, rows)
+
+
+def _apply_user(user_id, changes):
+    days = sorted(changes)
+    if len(days) == 1:
+        _apply_day(user_id, days[0], changes[days[0]])
+        return
+
+    # Entries from the last one before the earliest change onwards, read once.
+    # Each moves by the sum of the changes up to its date; new dates start
+    # from the balance carried in from the entry before them.
+    running = list(accumulate(changes[day] for day in days))
+
+    def moved(day):
+        position = bisect.bisect_right(days, day) - 1
+        return running[position] if position >= 0 else 0.0
+
+    anchor = (
+        select(func.max(table.c.date))
+        .where(table.c.user_id == user_id, table.c.date < days[0])
+        .scalar_subquery()
+    )
+    entries = db.session.execute(
+        select(table.c.id, table.c.date, table.c.balance)
+        .where(table.c.user_id == user_id, table.c.date >= func.coalesce(anchor, days[0]))
+        .order_by(table.c.date)
+    ).all()
+    entry_days = [day for _, day, _ in entries]
+
+    missing = []
+    for day in days:
+        position = bisect.bisect_right(entry_days, day) - 1
+        if position >= 0 and entry_days[position] == day:
+            continue
+        carried = entries[position][2] if position >= 0 else 0.0
+        missing.append({'user_id': user_id, 'date': day, 'net': changes[day], 'balance': carried + moved(day)})
+    if missing:
+        _insert(missing)
+
+    # Increments rather than recomputed totals, so concurrent writers for the
+    # same user cannot overwrite each other.
+    increments = [
+        {'b_id': id, 'b_net': changes.get(day, 0.0), 'b_amount': moved(day)}
+        for id, day, _ in entries if day >= days[0]
+    ]
+    if increments:
+        db.session.execute(
+            update(table)
+            .where(table.c.id == bindparam('b_id'))
+            .values(net=table.c.net + bindparam('b_net'), balance=table.c.balance + bindparam('b_amount')),
+            increments
+        )
+
+
+def _apply_day(user_id, day, amount):
+    # A single date needs no read of later entries: two set-based updates.
+    exists = db.session.execute(
+        select(table.c.id).where(table.c.user_id == user_id, table.c.date == day)
+    ).first()
+    if exists is None:
+        _insert([{'user_id': user_id, 'date': day, 'net': 0.0, 'balance': balance_at(user_id, day)}])
+    db.session.execute(
+        update(table)
+        .where(table.c.user_id == user_id, table.c.date == day)
+        .values(net=table.c.net + amount)
+    )
+    db.session.execute(
+        update(table)
+        .where(table.c.user_id == user_id, table.c.date >= day)
+        .values(balance=table.c.balance + amount)
+    )
+
+
+def _daily_select(user_ids=None):
+    movements = []
+    for model, sign in ((Income, 1), (Expense, -1)):
+        stmt = select(model.user_id.label('user_id'), model.date.label('date'), (model.amount * sign).label('amount'))
+        if user_ids is not None:
+            stmt = stmt.where(model.user_id.in_(user_ids))
+        movements.append(stmt)
+    movements = union_all(*movements).subquery()
+    net = func.sum(movements.c.amount)
+    return (
+        select(movements.c.user_id, movements.c.date, net,
+               func.sum(net).over(partition_by=movements.c.user_id, order_by=movements.c.date))
+        .group_by(movements.c.user_id, movements.c.date)
+    )
+
+
+# A single INSERT ... SELECT, so the rows never pass through Python.
+def rebuild(user_id=None, user_ids=None):
+    if user_id is not None:
+        user_ids = [user_id]
+    clear = delete(DailyBalance)
+    if user_ids is not None:
+        clear = clear.where(DailyBalance.user_id.in_(user_ids))
+    db.session.execute(clear)
+    db.session.execute(insert(table).from_select(['user_id', 'date', 'net', 'balance'], _daily_select(user_ids)))
+
+
+def verify(user_id=None, tolerance=1e-6):
+    expected = defaultdict(dict)
+    for uid, day, net, balance in db.session.execute(_daily_select(None if user_id is None else [user_id])):
+        expected[uid][day] = (net, balance)
+
+    stmt = select(table.c.user_id, table.c.date, table.c.net, table.c.balance)
+    if user_id is not None:
+        stmt = stmt.where(table.c.user_id == user_id)
+    actual = defaultdict(dict)
+    for uid, day, net, balance in db.session.execute(stmt):
+        actual[uid][day] = (net, balance)
+
+    mismatches = []
+    for uid in expected.keys() | actual.keys():
+        want_days = sorted(expected[uid])
+        for day in sorted(want_days + [d for d in actual[uid] if d not in expected[uid]]):
+            if day in expected[uid]:
+                want = expected[uid][day]
+            else:
+                # Dates whose entries were all deleted keep a zero-net row.
+                position = bisect.bisect_right(want_days, day) - 1
+                want = (0.0, expected[uid][want_days[position]][1] if position >= 0 else 0.0)
+            got = actual[uid].get(day, (0.0, None))
+            if got[1] is None or not all(
+                math.isclose(w, g, rel_tol=1e-9, abs_tol=tolerance) for w, g in zip(want, got)
+            ):
+                mismatches.append(((uid, day), want, got))
+    return mismatches
+
+
+@ledger_cli.command('rebuild')
+@click.option('--user-id', type=int, default=None, help='Only rebuild this user.')
+def rebuild_command(user_id):
+    rebuild(user_id)
+    db.session.commit()
+    click.echo('Ledger rebuilt.')
+
+
+@ledger_cli.command('verify')
+@click.option('--user-id', type=int, default=None, help='Only verify this user.')
+def verify_command(user_id):
+    mismatches = verify(user_id)
+    for key, want, got in sorted(mismatches):
+        click.echo(f'{key}: expected net={want[0]} balance={want[1]}, found net={got[0]} balance={got[1]}')
+    if mismatches:
+        raise SystemExit(1)
+    click.echo('Ledger matches base tables.')
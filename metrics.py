@@ -0,0 +1,116 @@
+from flask import Blueprint, Response
+from app import cache, hasher, pool_monitor, request_metrics
+from pools import WAIT_BUCKETS
+import serializers
+
+bp_metrics = Blueprint('metrics', __name__)
+
+PROMETHEUS_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _labels(**labels):
+    escape = lambda value: str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _bound(value):
+    return '+Inf' if value == float('inf') else repr(float(value))
+
+
+class _Exposition:
+    def __init__(self):
+        self.lines = []
+        self.declared = set()
+
+    def declare(self, name, kind, help_text):
+        if name not in self.declared:
+            self.declared.add(name)
+            self.lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+
+    def sample(self, name, value, **labels):
+        self.lines.append(f'{name}{_labels(**labels) if labels else ""} {value}')
+
+    def histogram(self, name, buckets, total, **labels):
+        # buckets: cumulative (upper bound, count) pairs ending with +Inf.
+        count = 0
+        for bound, count in buckets:
+            self.sample(f'{name}_bucket', count, **labels, le=_bound(bound))
+        self.sample(f'{name}_sum', total, **labels)
+        self.sample(f'{name}_count', count, **labels)
+
+    def text(self):
+        return '\n'.join(self.lines) + '\n'
+
+
+def _request_metrics(out):
+    with request_metrics._lock:
+        endpoints = sorted(request_metrics.endpoints.items())
+        out.declare('http_requests_total', 'counter', 'Requests by endpoint, method and status.')
+        for endpoint, metrics in endpoints:
+            for (method, status), count in sorted(metrics.requests.items()):
+                out.sample('http_requests_total', count, endpoint=endpoint, method=method, status=status)
+        for name, attribute, help_text in (
+            ('http_request_duration_seconds', 'latency', 'Time to produce the response.'),
+            ('http_request_queries', 'queries', 'SQL statements executed per request.'),
+            ('http_request_db_seconds', 'db_seconds', 'Time spent executing SQL per request.'),
+            ('http_response_size_bytes', 'response_size', 'Response body size, when known.'),
+        ):
+            out.declare(name, 'histogram', help_text)
+            for endpoint, metrics in endpoints:
+                histogram = getattr(metrics, attribute)
+                out.histogram(name, histogram.cumulative(), histogram.total, endpoint=endpoint)
+        out.declare('slow_queries_total', 'counter', 'Statements slower than SLOW_QUERY_SECONDS.')
+        out.sample('slow_queries_total', request_metrics.slow_queries)
+        out.declare('slow_requests_total', 'counter', 'Requests slower than SLOW_REQUEST_SECONDS.')
+        out.sample('slow_requests_total', request_metrics.slow_requests)
+
+
+def _cache_metrics(out):
+    for name, value in cache.stats().items():
+        out.declare(f'response_cache_{name}_total', 'counter', f'Response cache {name}.')
+        out.sample(f'response_cache_{name}_total', value)
+
+
+def _hasher_metrics(out):
+    for name, value in hasher.stats().items():
+        kind = 'gauge' if name in ('in_flight', 'workers', 'max_concurrency') or name.endswith('_max') else 'counter'
+        metric = f'password_hasher_{name}' + ('_total' if kind == 'counter' and not name.endswith('_total') else '')
+        out.declare(metric, kind, f'Password hasher {name.replace("_", " ")}.')
+        out.sample(metric, value)
+
+
+def _pool_metrics(out):
+    # Every sample of a metric has to be listed together, so walk by metric
+    # and then by engine.
+    engines = sorted(pool_monitor.stats().items())
+    for name, kind in (('size', 'gauge'), ('max_overflow', 'gauge'), ('checked_out', 'gauge'),
+                       ('idle', 'gauge'), ('overflow', 'gauge'), ('checkouts', 'counter'),
+                       ('overflow_events', 'counter'), ('timeouts', 'counter')):
+        metric = f'db_pool_{name}' + ('_total' if kind == 'counter' else '')
+        for engine, stats in engines:
+            if name in stats:
+                out.declare(metric, kind, f'Connection pool {name.replace("_", " ")}.')
+                out.sample(metric, stats[name], engine=engine)
+    for engine, stats in engines:
+        if 'wait_buckets' in stats:
+            running, buckets = 0, []
+            for bound, count in zip([*WAIT_BUCKETS, float('inf')], stats['wait_buckets'].values()):
+                running += count
+                buckets.append((bound, running))
+            out.declare('db_pool_wait_seconds', 'histogram', 'Time waited for a connection on checkout.')
+            out.histogram('db_pool_wait_seconds', buckets, stats['wait_seconds'], engine=engine)
+
+
+@bp_metrics.route('', methods=['GET'])
+def get_metrics():
+    out = _Exposition()
+    _request_metrics(out)
+    _cache_metrics(out)
+    _hasher_metrics(out)
+    _pool_metrics(out)
+    return Response(out.text(), content_type=PROMETHEUS_TYPE)
+
+
+@bp_metrics.route('/pools', methods=['GET'])
+def get_pool_stats():
+    return serializers.response(pool_monitor.stats())
@@ -0,0 +1,49 @@
+"""monthly rollup
+
+Revision ID: 3f1c2a9d7e41
+Revises: 06b6decd392d
+Create Date: 2026-10-17 09:12:31.514210
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7e41'
+down_revision = '06b6decd392d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('monthly_rollup',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'year', 'month', 'kind', 'category', name='uq_monthly_rollup_key')
+    )
+    # Backfill from the existing rows, one INSERT ... SELECT per kind.
+    rollup = sa.table('monthly_rollup', *(sa.column(name) for name in
+                                          ('user_id', 'year', 'month', 'kind', 'category', 'total', 'count')))
+    for kind, label in (('income', 'source'), ('expense', 'category')):
+        source = sa.table(kind, sa.column('user_id'), sa.column('date', sa.Date()), sa.column('amount'), sa.column(label))
+        year = sa.extract('year', source.c.date)
+        month = sa.extract('month', source.c.date)
+        op.execute(rollup.insert().from_select(
+            ['user_id', 'year', 'month', 'kind', 'category', 'total', 'count'],
+            sa.select(source.c.user_id, sa.cast(year, sa.Integer), sa.cast(month, sa.Integer), sa.literal(kind),
+                      source.c[label], sa.func.sum(source.c.amount), sa.func.count())
+            .group_by(source.c.user_id, year, month, source.c[label])
+        ))
+
+
+def downgrade():
+    op.drop_table('monthly_rollup')
@@ -0,0 +1,26 @@
+"""user data version
+
+Revision ID: 5a7e3c19b2d8
+Revises: c4d9a1e37f20
+Create Date: 2026-10-17 12:41:52.630918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a7e3c19b2d8'
+down_revision = 'c4d9a1e37f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('data_version')
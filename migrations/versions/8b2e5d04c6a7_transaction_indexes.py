@@ -0,0 +1,46 @@
+"""transaction indexes
+
+Revision ID: 8b2e5d04c6a7
+Revises: 3f1c2a9d7e41
+Create Date: 2026-10-17 10:02:47.208391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e5d04c6a7'
+down_revision = '3f1c2a9d7e41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('income', schema=None) as batch_op:
+        batch_op.create_index('ix_income_user_id_date', ['user_id', 'date'], unique=False)
+
+    with op.batch_alter_table('expense', schema=None) as batch_op:
+        batch_op.create_index('ix_expense_user_id_date', ['user_id', 'date'], unique=False)
+        batch_op.create_index('ix_expense_user_id_category_date', ['user_id', 'category', 'date'], unique=False)
+
+    with op.batch_alter_table('budget', schema=None) as batch_op:
+        batch_op.create_index('ix_budget_user_id_year_month', ['user_id', 'year', 'month'], unique=False)
+
+    with op.batch_alter_table('financial_goal', schema=None) as batch_op:
+        batch_op.create_index('ix_financial_goal_user_id', ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('financial_goal', schema=None) as batch_op:
+        batch_op.drop_index('ix_financial_goal_user_id')
+
+    with op.batch_alter_table('budget', schema=None) as batch_op:
+        batch_op.drop_index('ix_budget_user_id_year_month')
+
+    with op.batch_alter_table('expense', schema=None) as batch_op:
+        batch_op.drop_index('ix_expense_user_id_category_date')
+        batch_op.drop_index('ix_expense_user_id_date')
+
+    with op.batch_alter_table('income', schema=None) as batch_op:
+        batch_op.drop_index('ix_income_user_id_date')
@@ -0,0 +1,36 @@
+"""import fingerprints
+
+Revision ID: c4d9a1e37f20
+Revises: 8b2e5d04c6a7
+Create Date: 2026-10-17 11:26:05.117342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d9a1e37f20'
+down_revision = '8b2e5d04c6a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('income', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('fingerprint', sa.String(length=64), nullable=True))
+        batch_op.create_unique_constraint('uq_income_fingerprint', ['fingerprint'])
+
+    with op.batch_alter_table('expense', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('fingerprint', sa.String(length=64), nullable=True))
+        batch_op.create_unique_constraint('uq_expense_fingerprint', ['fingerprint'])
+
+
+def downgrade():
+    with op.batch_alter_table('expense', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_expense_fingerprint', type_='unique')
+        batch_op.drop_column('fingerprint')
+
+    with op.batch_alter_table('income', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_income_fingerprint', type_='unique')
+        batch_op.drop_column('fingerprint')
@@ -0,0 +1,49 @@
+"""daily balance ledger
+
+Revision ID: d2a64f8e1b35
+Revises: e81f6b2c0a93
+Create Date: 2026-10-17 16:41:07.318526
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a64f8e1b35'
+down_revision = 'e81f6b2c0a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_balance',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('net', sa.Float(), nullable=False),
+    sa.Column('balance', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'date', name='uq_daily_balance_user_id_date')
+    )
+    # Backfill from the existing rows: net movement per user and day, and its
+    # running total, in a single INSERT ... SELECT.
+    movements = []
+    for kind, sign in (('income', 1), ('expense', -1)):
+        source = sa.table(kind, sa.column('user_id'), sa.column('date', sa.Date()), sa.column('amount'))
+        movements.append(sa.select(source.c.user_id.label('user_id'), source.c.date.label('date'),
+                                   (source.c.amount * sign).label('amount')))
+    movements = sa.union_all(*movements).subquery()
+    net = sa.func.sum(movements.c.amount)
+    ledger = sa.table('daily_balance', sa.column('user_id'), sa.column('date'), sa.column('net'), sa.column('balance'))
+    op.execute(ledger.insert().from_select(
+        ['user_id', 'date', 'net', 'balance'],
+        sa.select(movements.c.user_id, movements.c.date, net,
+                  sa.func.sum(net).over(partition_by=movements.c.user_id, order_by=movements.c.date))
+        .group_by(movements.c.user_id, movements.c.date)
+    ))
+
+
+def downgrade():
+    op.drop_table('daily_balance')
@@ -4,9 +4,10 @@ class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(150), unique=True, nullable=False)
     email = db.Column(db.String(150), unique=True, nullable=False)
-    password = db.Column(db.String(128), nullable=False)
+    password = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # bumped on every data change
     
     incomes = db.relationship('Income', backref='user', lazy=True)
     expenses = db.relationship('Expense', backref='user', lazy=True)
@@ -14,22 +15,37 @@ class User(db.Model):
     financial_goals = db.relationship('FinancialGoal', backref='user', lazy=True)
 
 class Income(db.Model):
+    __table_args__ = (
+        db.Index('ix_income_user_id_date', 'user_id', 'date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     amount = db.Column(db.Float, nullable=False)
     source = db.Column(db.String(100), nullable=False)
     date = db.Column(db.Date, nullable=False)
     description = db.Column(db.String(255))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    fingerprint = db.Column(db.String(64), unique=True)  # set for rows imported from bank statements
 
 class Expense(db.Model):
+    __table_args__ = (
+        db.Index('ix_expense_user_id_date', 'user_id', 'date'),
+        db.Index('ix_expense_user_id_category_date', 'user_id', 'category', 'date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     amount = db.Column(db.Float, nullable=False)
     category = db.Column(db.String(100), nullable=False)
     date = db.Column(db.Date, nullable=False)
     description = db.Column(db.String(255))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    fingerprint = db.Column(db.String(64), unique=True)  # set for rows imported from bank statements
 
 class Budget(db.Model):
+    __table_args__ = (
+        db.Index('ix_budget_user_id_year_month', 'user_id', 'year', 'month'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     category = db.Column(db.String(100), nullable=False)
     limit = db.Column(db.Float, nullable=False)
@@ -38,9 +54,38 @@ class Budget(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
 class FinancialGoal(db.Model):
+    __table_args__ = (
+        db.Index('ix_financial_goal_user_id', 'user_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     goal_name = db.Column(db.String(200), nullable=False)
     target_amount = db.Column(db.Float, nullable=False)
     current_amount = db.Column(db.Float, default=0)
     target_date = db.Column(db.Date, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+
+class MonthlyRollup(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'year', 'month', 'kind', 'category', name='uq_monthly_rollup_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.Integer, nullable=False)
+    kind = db.Column(db.String(10), nullable=False)  # 'income' or 'expense'
+    category = db.Column(db.String(100), nullable=False)  # Income.source or Expense.category
+    total = db.Column(db.Float, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class DailyBalance(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'date', name='uq_daily_balance_user_id_date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    net = db.Column(db.Float, nullable=False, default=0)  # income minus expenses on this date
+    balance = db.Column(db.Float, nullable=False, default=0)  # running total through this date
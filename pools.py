@@ -0,0 +1,142 @@
+import bisect
+import threading
+import time
+from flask import current_app
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds, in seconds, of the checkout wait histogram.
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+        self.overflow_events = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def record(self, waited, overflowed=False, timed_out=False):
+        with self._lock:
+            self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS, waited)] += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            if overflowed:
+                self.overflow_events += 1
+
+
+class _Timed:
+    # Times every checkout, including the wait for a free connection when
+    # the pool is exhausted. Counters survive pool.recreate() (dispose,
+    # invalidation), which builds a new pool of the same class.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        overflow = self._overflow
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        # _overflow counts open connections minus pool_size.
+        self.metrics.record(time.perf_counter() - started, self._overflow > max(overflow, 0))
+        return connection
+
+
+class TimedQueuePool(_Timed, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_Timed, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(url, config, asyncio=False):
+    # In-memory SQLite keeps its single static connection.
+    if url is None:
+        return {}
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return {}
+    return {
+        'poolclass': TimedAsyncQueuePool if asyncio else TimedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+    }
+
+
+class PoolMonitor:
+    def __init__(self, app=None):
+        self.engines = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Before db.init_app, which reads the engine options and binds.
+        app.config.setdefault('DB_POOL_SIZE', 5)
+        app.config.setdefault('DB_MAX_OVERFLOW', 10)
+        app.config.setdefault('DB_POOL_RECYCLE', 1800)
+        app.config.setdefault('DB_POOL_PRE_PING', True)
+        app.config.setdefault('DB_POOL_TIMEOUT', 30)
+        options = pool_options(app.config['SQLALCHEMY_DATABASE_URI'], app.config)
+        options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+        binds = {}
+        for key, bind in (app.config.get('SQLALCHEMY_BINDS') or {}).items():
+            bind = dict(bind) if isinstance(bind, dict) else {'url': bind}
+            binds[key] = {**pool_options(bind['url'], app.config), **bind}
+        app.config['SQLALCHEMY_BINDS'] = binds
+        app.extensions['pool_monitor'] = self
+
+    def watch(self, name, engine):
+        # Engines created outside Flask-SQLAlchemy, e.g. the ASGI async engines.
+        self.engines[name] = engine
+
+    def stats(self):
+        db = current_app.extensions['sqlalchemy']
+        engines = {key or 'primary': engine for key, engine in db.engines.items()}
+        engines.update(self.engines)
+        return {name: self._pool_stats(engine.pool) for name, engine in engines.items()}
+
+    def _pool_stats(self, pool):
+        if not isinstance(pool, QueuePool):
+            return {'pool': type(pool).__name__}
+        stats = {
+            'pool': type(pool).__name__,
+            'size': pool.size(),
+            'max_overflow': pool._max_overflow,
+            'checked_out': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+        }
+        metrics = getattr(pool, 'metrics', None)
+        if metrics is not None:
+            with metrics._lock:
+                stats.update({
+                    'checkouts': metrics.checkouts,
+                    'wait_seconds': metrics.wait_seconds,
+                    'max_wait_seconds': metrics.max_wait_seconds,
+                    'wait_buckets': dict(zip([*map(str, WAIT_BUCKETS), '+Inf'], metrics.wait_buckets)),
+                    'overflow_events': metrics.overflow_events,
+                    'timeouts': metrics.timeouts,
+                })
+        return stats
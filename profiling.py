@@ -0,0 +1,76 @@
+import cProfile
+import hmac
+import os
+import pstats
+import random
+import threading
+from flask import request
+
+
+class RequestProfiler:
+    # Opt-in cProfile sampling. Nothing is hooked in unless PROFILE_DIR is
+    # set, and then unsampled requests only pay for the sampling decision.
+    # Profiles are merged per endpoint and written to
+    # <PROFILE_DIR>/<endpoint>.<pid>.prof for pstats, snakeviz or flameprof.
+    def __init__(self, app=None):
+        self.directory = None
+        self.sample_rate = 0.0
+        self.endpoints = frozenset()
+        self.token = None
+        self.header = 'X-Profile'
+        self._stats = {}
+        self._lock = threading.Lock()
+        # cProfile allows one active profiler at a time on Python 3.12+, and
+        # profiling one request at a time also bounds the overhead.
+        self._active = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PROFILE_DIR', None)
+        app.config.setdefault('PROFILE_SAMPLE_RATE', 0.0)
+        app.config.setdefault('PROFILE_ENDPOINTS', '')
+        app.config.setdefault('PROFILE_TOKEN', None)
+        app.config.setdefault('PROFILE_HEADER', 'X-Profile')
+        if not app.config['PROFILE_DIR']:
+            return
+        self.directory = app.config['PROFILE_DIR']
+        self.sample_rate = app.config['PROFILE_SAMPLE_RATE']
+        self.endpoints = frozenset(name.strip() for name in app.config['PROFILE_ENDPOINTS'].split(',') if name.strip())
+        self.token = app.config['PROFILE_TOKEN']
+        self.header = app.config['PROFILE_HEADER']
+        os.makedirs(self.directory, exist_ok=True)
+        app.before_request(self._start)
+        app.teardown_request(self._stop)
+        app.extensions['request_profiler'] = self
+
+    def _wanted(self):
+        # compare_digest only takes ASCII str, so compare the encoded bytes.
+        if self.token and hmac.compare_digest(request.headers.get(self.header, '').encode(), self.token.encode()):
+            return True
+        if request.endpoint in self.endpoints or (request.url_rule is not None and request.url_rule.rule in self.endpoints):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _start(self):
+        if not self._wanted() or not self._active.acquire(blocking=False):
+            return
+        # Kept on the request rather than g, which a /batch operation's nested
+        # request context shares.
+        profiler = request.environ['app.profiler'] = cProfile.Profile()
+        profiler.enable()
+
+    def _stop(self, exc):
+        profiler = request.environ.pop('app.profiler', None)
+        if profiler is None:
+            return
+        profiler.disable()
+        self._active.release()
+        endpoint = request.endpoint or 'unmatched'
+        with self._lock:
+            stats = self._stats.get(endpoint)
+            if stats is None:
+                stats = self._stats[endpoint] = pstats.Stats(profiler)
+            else:
+                stats.add(profiler)
+            stats.dump_stats(os.path.join(self.directory, f'{endpoint}.{os.getpid()}.prof'))
@@ -0,0 +1,86 @@
+from datetime import date
+import numpy as np
+from sqlalchemy import func, select
+from app import db, cache
+from models import FinancialGoal, MonthlyRollup
+import serializers
+import versions
+
+HISTORY_MONTHS = 12
+DAYS_PER_MONTH = 365.25 / 12
+
+
+def monthly_savings(user_id, today, months=HISTORY_MONTHS):
+    # Mean net savings over the last `months` complete months, read from the
+    # rollup; months without activity count as zero once history has started.
+    this_month = today.year * 12 + today.month - 1
+    stmt = (
+        select(MonthlyRollup.year * 12 + MonthlyRollup.month - 1, MonthlyRollup.kind, func.sum(MonthlyRollup.total))
+        .where(MonthlyRollup.user_id == user_id)
+        .group_by(MonthlyRollup.year, MonthlyRollup.month, MonthlyRollup.kind)
+    )
+    rows = db.session.execute(stmt).all()
+    if not rows:
+        return 0.0
+    index, kinds, totals = (np.array(column) for column in zip(*rows))
+    net = np.where(kinds == 'income', totals, -totals)
+    window = (index >= this_month - months) & (index < this_month)
+    first = index.min()
+    span = min(months, this_month - first)
+    if span <= 0:
+        return 0.0
+    return float(net[window].sum() / span)
+
+
+LAST_DAY = np.datetime64(date.max, 'D')
+
+
+def project(goals, savings, today):
+    # All goals at once: columns in, columns out.
+    if not goals:
+        return []
+    ids, names, targets, currents, target_dates = zip(*goals)
+    targets = np.array(targets, dtype=float)
+    currents = np.array([current or 0.0 for current in currents], dtype=float)
+    target_days = np.array(target_dates, dtype='datetime64[D]')
+    today = np.datetime64(today, 'D')
+
+    remaining = np.maximum(targets - currents, 0.0)
+    months_left = np.maximum(
+        (target_days.astype('datetime64[M]') - today.astype('datetime64[M]')).astype(np.int64), 1
+    )
+    required = remaining / months_left
+    if savings > 0:
+        days_needed = np.ceil(remaining / savings * DAYS_PER_MONTH)
+        # Past date.max there is no date to report (numpy would hand back a
+        # raw day count), so those goals get no completion date.
+        in_range = days_needed <= (LAST_DAY - today).astype(np.int64)
+        completion = today + np.where(in_range, days_needed, 0).astype(np.int64).astype('timedelta64[D]')
+        on_track = ((completion <= target_days) & in_range) | (remaining == 0)
+        completion = [day if ok else None for day, ok in zip(completion.tolist(), in_range.tolist())]
+    else:
+        completion = [today.tolist() if left == 0 else None for left in remaining]
+        on_track = remaining == 0
+
+    return [
+        serializers.GoalProjection(*fields) for fields in zip(
+            ids, names, targets.tolist(), currents.tolist(), target_dates, remaining.round(2).tolist(),
+            required.round(2).tolist(), completion, on_track.tolist()
+        )
+    ]
+
+
+def compute(user_id, today):
+    goals = db.session.execute(
+        select(FinancialGoal.id, FinancialGoal.goal_name, FinancialGoal.target_amount,
+               FinancialGoal.current_amount, FinancialGoal.target_date)
+        .where(FinancialGoal.user_id == user_id)
+    ).all()
+    savings = monthly_savings(user_id, today)
+    return {'monthly_savings': round(savings, 2), 'goals': project(goals, savings, today)}
+
+
+def projections(user_id, today=None):
+    today = today or date.today()
+    key = f'projections:{user_id}:{versions.current(user_id)}:{today.isoformat()}'
+    return cache.memoize(key, lambda: compute(user_id, today))
@@ -0,0 +1,120 @@
+import re
+import click
+from datetime import date
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from config import Config
+from feed import encode_cursor
+
+# Every read path in bp_routes; each must be answered without a full table scan.
+ENDPOINTS = [
+    '/routes/transactions',
+    '/routes/transactions?start_date=2024-01-01&end_date=2024-12-31',
+    '/routes/transactions?start_date=2024-01-01&end_date=2024-12-31&category=Food',
+    '/routes/transactions?limit=10&after=' + encode_cursor(date(2024, 12, 31), 'income', 1),
+    '/routes/transactions?category=Food&after=' + encode_cursor(date(2024, 12, 31), 'expense', 1),
+    '/routes/recent_transactions',
+    '/routes/analytics',
+    '/routes/analytics?granularity=week&start_date=2024-01-01&end_date=2024-12-31',
+    '/routes/balance',
+    '/routes/balance/at?date=2024-03-15',
+    '/routes/balance/history',
+    '/routes/balance/history?start_date=2024-01-01&end_date=2024-12-31',
+    '/routes/monthly_summary?year=2024&month=3',
+    '/routes/budget',
+    '/routes/budget/1',
+    '/routes/budget/status',
+    '/routes/budget/status?year=2024&month=3',
+    '/routes/financial_goals',
+    '/routes/financial_goals/projections',
+]
+
+# A SCAN row reads every row of a table, or every entry of one of its indexes,
+# however it is worded: 'SCAN TABLE x' before SQLite 3.36, 'SCAN x' since, both
+# optionally followed by 'USING [COVERING] INDEX ...'. Scans of subquery
+# results and of the constant row are not table reads.
+_FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(?!SUBQUERY\b|CONSTANT ROW\b)\w+\b')
+
+
+class PlanCheckConfig(Config):
+    SECRET_KEY = Config.SECRET_KEY or 'query-plan-check'
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+
+def _seed(db):
+    from models import User, Income, Expense, Budget, FinancialGoal, MonthlyRollup
+    user = User(username='plan-check', email='plan-check@example.com', password='x')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add_all([
+        Income(amount=100, source='Salary', date=date(2024, 3, 1), user_id=user.id),
+        Expense(amount=10, category='Food', date=date(2024, 3, 2), user_id=user.id),
+        Budget(category='Food', limit=50, year=2024, month=3, user_id=user.id),
+        FinancialGoal(goal_name='Car', target_amount=1000, target_date=date(2025, 1, 1), user_id=user.id),
+        MonthlyRollup(user_id=user.id, year=2024, month=3, kind='expense', category='Food', total=10, count=1),
+    ])
+    db.session.commit()
+    return user.id
+
+
+def is_full_scan(detail):
+    return _FULL_SCAN.match(detail) is not None
+
+
+def full_scans(connection, statement, parameters=()):
+    plan = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+    details = [row[-1] for row in plan]
+    return details, [d for d in details if is_full_scan(d)]
+
+
+def check(config_class=PlanCheckConfig, endpoints=ENDPOINTS):
+    from app import create_app, db
+
+    app = create_app(config_class)
+    report = []
+    with app.app_context():
+        db.create_all()
+        user_id = _seed(db)
+        headers = {'Authorization': 'Bearer ' + create_access_token(identity=user_id)}
+        client = app.test_client()
+
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                captured.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            for path in endpoints:
+                del captured[:]
+                response = client.get(path, headers=headers)
+                statements = list(captured)
+                if response.status_code >= 500:
+                    report.append((path, response.status_code, '', [], ['request failed']))
+                with db.engine.connect() as connection:
+                    for statement, parameters in statements:
+                        details, scans = full_scans(connection, statement, parameters)
+                        report.append((path, response.status_code, statement, details, scans))
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+    return report
+
+
+@click.command('check-query-plans')
+@click.option('--verbose', is_flag=True, help='Print every query plan, not just failures.')
+def check_query_plans_command(verbose):
+    """Fail if any bp_routes read query does a full table scan on SQLite."""
+    failures = 0
+    for path, status, statement, details, scans in check():
+        if scans:
+            failures += 1
+        if scans or verbose:
+            click.echo(f'{"FULL SCAN" if scans else "ok"}  {path} [{status}]')
+            click.echo('    ' + ' '.join(statement.split()))
+            for detail in details:
+                click.echo('      ' + detail)
+    if failures:
+        click.echo(f'{failures} endpoint queries failed the plan check.')
+        raise SystemExit(1)
+    click.echo('All endpoint queries use an index.')
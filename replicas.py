@@ -0,0 +1,79 @@
+import math
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA = 'replica'
+# Response cache backends every worker sees, so a write on one worker keeps
+# the user's reads on the primary whichever worker answers next. Not
+# filesystem: its counters are not atomic across processes (see cache.py).
+SHARED_CACHE_TYPES = ('redis',)
+
+
+class ReplicaRouter:
+    # Sends the reads of GET requests under /routes to the replica bind. A
+    # user who has just written is read from the primary for
+    # READ_YOUR_WRITES_SECONDS, so they never see their own change missing.
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Before db.init_app, which reads SQLALCHEMY_BINDS.
+        app.config.setdefault('REPLICA_DATABASE_URL', None)
+        app.config.setdefault('READ_YOUR_WRITES_SECONDS', 5)
+        if app.config['REPLICA_DATABASE_URL']:
+            binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+            binds.setdefault(REPLICA, app.config['REPLICA_DATABASE_URL'])
+            app.config['SQLALCHEMY_BINDS'] = binds
+            if app.config['READ_YOUR_WRITES_SECONDS'] and app.config.get('CACHE_TYPE') not in SHARED_CACHE_TYPES:
+                raise RuntimeError('REPLICA_DATABASE_URL needs CACHE_TYPE redis to keep '
+                                   'read-your-writes marks across workers (or READ_YOUR_WRITES_SECONDS=0)')
+        app.extensions['replica_router'] = self
+
+    def _marks(self):
+        # init_app has made sure this is a shared backend whenever a replica
+        # and a read-your-writes window are configured.
+        if not current_app.config['REPLICA_DATABASE_URL'] or not current_app.config['READ_YOUR_WRITES_SECONDS']:
+            return None
+        return current_app.extensions['response_cache']
+
+    def recently_wrote(self, user_id):
+        marks = self._marks()
+        return marks is not None and marks.get(f'wrote:{user_id}') is not None
+
+    def note_write(self, response):
+        marks = self._marks()
+        if request.method in ('POST', 'PUT', 'PATCH', 'DELETE') and marks is not None:
+            try:
+                user_id = get_jwt_identity()
+            except RuntimeError:
+                return response
+            if user_id is not None:
+                marks.set(f'wrote:{user_id}', True, timeout=math.ceil(current_app.config['READ_YOUR_WRITES_SECONDS']))
+        return response
+
+    def use_replica(self):
+        if not has_request_context() or request.method != 'GET' or request.blueprint != 'routes':
+            return False
+        if '_read_replica' not in g:
+            try:
+                user_id = get_jwt_identity()
+            except RuntimeError:
+                user_id = None
+            g._read_replica = user_id is not None and not self.recently_wrote(user_id)
+        return g._read_replica
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        engines = self._db.engines
+        if (
+            bind is None and REPLICA in engines and engine is engines[None]
+            and not self._flushing and not isinstance(clause, UpdateBase)
+            and current_app.extensions['replica_router'].use_replica()
+        ):
+            return engines[REPLICA]
+        return engine
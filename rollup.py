@@ -0,0 +1,161 @@
+import click
+import math
+from collections import defaultdict
+from flask.cli import AppGroup
+from sqlalchemy import Integer, cast, delete, extract, func, insert, literal, select, update
+from app import db
+from models import Income, Expense, MonthlyRollup
+import dialects
+import ledger
+
+rollup_cli = AppGroup('rollup', help='Maintain the monthly income/expense rollup.')
+
+KINDS = {
+    'income': (Income, Income.source),
+    'expense': (Expense, Expense.category),
+}
+
+
+def kind_of(entry):
+    return 'income' if isinstance(entry, Income) else 'expense'
+
+
+def label_of(entry):
+    return entry.source if isinstance(entry, Income) else entry.category
+
+
+# Net effect of an entry on the running balance.
+def direction(kind):
+    return 1 if kind == 'income' else -1
+
+
+# sign=-1 removes a previously tracked Income/Expense row. The daily balance
+# ledger is kept in step with the rollup here.
+def track(entry, sign=1):
+    track_all([entry], sign)
+
+
+def track_all(entries, sign=1):
+    apply([(entry.user_id, entry.date.year, entry.date.month, kind_of(entry),
+            label_of(entry), sign * float(entry.amount), sign) for entry in entries])
+    ledger.apply([(entry.user_id, entry.date, sign * direction(kind_of(entry)) * float(entry.amount))
+                  for entry in entries])
+
+
+# rows are the plain dicts passed to insert(), all of the same kind.
+def track_rows(kind, rows):
+    label_field = 'source' if kind == 'income' else 'category'
+    apply([(row['user_id'], row['date'].year, row['date'].month, kind,
+            row[label_field], row['amount'], 1) for row in rows])
+    ledger.apply([(row['user_id'], row['date'], direction(kind) * row['amount']) for row in rows])
+
+
+def apply(deltas):
+    merged = defaultdict(lambda: [0.0, 0])
+    for user_id, year, month, kind, category, amount, count in deltas:
+        bucket = merged[(user_id, year, month, kind, category)]
+        bucket[0] += amount
+        bucket[1] += count
+    if not merged:
+        return
+
+    params = [
+        {'user_id': user_id, 'year': year, 'month': month, 'kind': kind,
+         'category': category, 'total': amount, 'count': count}
+        for (user_id, year, month, kind, category), (amount, count) in merged.items()
+    ]
+    table = MonthlyRollup.__table__
+
+    if dialects.supports_on_conflict():
+        stmt = dialects.insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['user_id', 'year', 'month', 'kind', 'category'],
+            set_={
+                'total': table.c.total + stmt.excluded.total,
+                'count': table.c.count + stmt.excluded.count,
+            }
+        )
+        db.session.execute(stmt, params)
+        return
+
+    for row in params:
+        result = db.session.execute(
+            update(table)
+            .where(table.c.user_id == row['user_id'], table.c.year == row['year'],
+                   table.c.month == row['month'], table.c.kind == row['kind'],
+                   table.c.category == row['category'])
+            .values(total=table.c.total + row['total'], count=table.c.count + row['count'])
+        )
+        if result.rowcount == 0:
+            db.session.execute(insert(table).values(**row))
+
+
+def _base_select(kind, user_ids=None):
+    model, label = KINDS[kind]
+    year = extract('year', model.date)
+    month = extract('month', model.date)
+    stmt = (
+        select(model.user_id, cast(year, Integer), cast(month, Integer), label, func.sum(model.amount), func.count())
+        .group_by(model.user_id, year, month, label)
+    )
+    if user_ids is not None:
+        stmt = stmt.where(model.user_id.in_(user_ids))
+    return stmt
+
+
+# One INSERT ... SELECT per kind, so the rows never pass through Python.
+def rebuild(user_id=None, user_ids=None):
+    if user_id is not None:
+        user_ids = [user_id]
+    clear = delete(MonthlyRollup)
+    if user_ids is not None:
+        clear = clear.where(MonthlyRollup.user_id.in_(user_ids))
+    db.session.execute(clear)
+
+    for kind in KINDS:
+        db.session.execute(insert(MonthlyRollup).from_select(
+            ['user_id', 'year', 'month', 'category', 'total', 'count', 'kind'],
+            _base_select(kind, user_ids).add_columns(literal(kind))
+        ))
+
+
+def verify(user_id=None, tolerance=1e-6):
+    expected = {}
+    for kind in KINDS:
+        for uid, year, month, category, amount, count in db.session.execute(_base_select(kind, None if user_id is None else [user_id])):
+            expected[(uid, int(year), int(month), kind, category)] = (amount, count)
+
+    stmt = select(MonthlyRollup).where(MonthlyRollup.count != 0)
+    if user_id is not None:
+        stmt = stmt.where(MonthlyRollup.user_id == user_id)
+    actual = {
+        (r.user_id, r.year, r.month, r.kind, r.category): (r.total, r.count)
+        for r in db.session.scalars(stmt)
+    }
+
+    mismatches = []
+    for key in expected.keys() | actual.keys():
+        want = expected.get(key, (0.0, 0))
+        got = actual.get(key, (0.0, 0))
+        if want[1] != got[1] or not math.isclose(want[0], got[0], rel_tol=1e-9, abs_tol=tolerance):
+            mismatches.append((key, want, got))
+    return mismatches
+
+
+@rollup_cli.command('rebuild')
+@click.option('--user-id', type=int, default=None, help='Only rebuild this user.')
+def rebuild_command(user_id):
+    rebuild(user_id)
+    db.session.commit()
+    click.echo('Rollup rebuilt.')
+
+
+@rollup_cli.command('verify')
+@click.option('--user-id', type=int, default=None, help='Only verify this user.')
+def verify_command(user_id):
+    mismatches = verify(user_id)
+    for key, want, got in sorted(mismatches):
+        click.echo(f'{key}: expected total={want[0]} count={want[1]}, found total={got[0]} count={got[1]}')
+    if mismatches:
+        raise SystemExit(1)
+    click.echo('Rollup matches base tables.')
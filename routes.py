@@ -1,20 +1,34 @@
-from flask import Blueprint, request, jsonify
-from app import db
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from app import db, cache, router
 from models import User, Income, Expense, Budget, FinancialGoal
-from datetime import datetime, timedelta
-from schemas import IncomeSchema, ExpenseSchema, BudgetSchema, FinancialGoalSchema, validate_income, validate_expense
+from datetime import datetime
+from schemas import income_validator, expense_validator, budget_validator, financial_goal_validator
+from schemas import expense_filter_schema, income_filter_schema, expense_patch_schema, income_patch_schema
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select
 from marshmallow import ValidationError
+import aggregates
+import analytics
+import batch
+import bulk
+import etags
+import export
+import feed
+import importer
+import ingest
+import ledger
+import projections
+import rollup
+import serializers
 
 bp_routes = Blueprint('routes', __name__)
-expense_schema = ExpenseSchema()
-budget_schema = BudgetSchema()
+bp_routes.after_request(cache.invalidate_after_write)
+bp_routes.after_request(router.note_write)
 
 @bp_routes.route('/income', methods=['POST'])
 @jwt_required()
 def add_income():
-    data = request.json
-    validated_data, errors = validate_income(data)
+    validated_data, errors = income_validator.load_request(request)
     if errors:
         return jsonify({"errors": errors}), 400
     
@@ -27,7 +41,8 @@ def add_income():
         user_id=user_id
     )
     db.session.add(new_income)
-    db.session.commit()
+    rollup.track(new_income)
+    batch.commit()
     return jsonify({'message': 'Income added successfully'}), 201
 
 
@@ -35,28 +50,25 @@ def add_income():
 @bp_routes.route('/income/<int:id>', methods=['PUT'])
 @jwt_required()
 def update_income(id):
-    data = request.json
     user_id = get_jwt_identity()
     income = Income.query.filter_by(id=id, user_id=user_id).first()
 
     if not income:
         return jsonify({'message': 'Income record not found'}), 404
 
-    validated_data, validation_errors = validate_income(data)
+    validated_data, validation_errors = income_validator.load_request(request)
     if validation_errors:
         return jsonify(validation_errors), 400
 
+    rollup.track(income, -1)
     income.amount = validated_data['amount']
     income.source = validated_data['source']
-
-    if isinstance(validated_data['date'], str):
-        income.date = datetime.strptime(validated_data['date'], '%Y-%m-%d').date()
-    else:
-        income.date = validated_data['date']
+    income.date = validated_data['date']
 
     income.description = validated_data.get('description', income.description)
+    rollup.track(income)
 
-    db.session.commit()
+    batch.commit()
     return jsonify({'message': 'Income updated successfully'}), 200
 @bp_routes.route('/income/<int:id>', methods=['DELETE'])
 @jwt_required()
@@ -67,8 +79,9 @@ def delete_income(id):
     if not income:
         return jsonify({'message': 'Income record not found'}), 404
 
+    rollup.track(income, -1)
     db.session.delete(income)
-    db.session.commit()
+    batch.commit()
     return jsonify({'message': 'Income deleted successfully'}), 200
 
 @bp_routes.route('/expense', methods=['POST'])
@@ -78,68 +91,105 @@ def add_expense():
     user_id = get_jwt_identity()
 
     if isinstance(data, list):
-        expenses = []
-        for exp in data:
-            try:
-                expense_date = datetime.strptime(exp['date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        valid, errors = expense_validator.load_many(data)
+        if errors:
+            return jsonify({"errors": errors}), 400
 
+        expenses = []
+        for index in sorted(valid):
+            exp = valid[index]
             new_expense = Expense(
                 amount=exp['amount'],
                 category=exp['category'],
-                date=expense_date,
-                description=exp['description'],
+                date=exp['date'],
+                description=exp.get('description', ''),
                 user_id=user_id
             )
             db.session.add(new_expense)
             expenses.append(new_expense)
 
-        db.session.commit()
+        rollup.track_all(expenses)
+        batch.commit()
         return jsonify({"message": "Expenses added successfully"}), 201
 
     elif isinstance(data, dict):
-        try:
-            expense_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
-        except ValueError:
-            return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        validated_data, errors = expense_validator.load_request(request)
+        if errors:
+            return jsonify(errors), 400
 
         new_expense = Expense(
-            amount=data['amount'],
-            category=data['category'],
-            date=expense_date,
-            description=data['description'],
+            amount=validated_data['amount'],
+            category=validated_data['category'],
+            date=validated_data['date'],
+            description=validated_data.get('description', ''),
             user_id=user_id
         )
         db.session.add(new_expense)
-        db.session.commit()
+        rollup.track(new_expense)
+        batch.commit()
 
         return jsonify({"message": "Expense added successfully"}), 201
 
     else:
         return jsonify({"error": "Invalid data format"}), 400
 
+@bp_routes.route('/expense/bulk', methods=['POST'])
+@jwt_required()
+def bulk_add_expenses():
+    data = request.json
+    user_id = get_jwt_identity()
+
+    if not isinstance(data, list):
+        return jsonify({"error": "Expected a list of expenses"}), 400
+
+    inserted, errors = ingest.ingest_expenses(user_id, data)
+    if errors and not inserted:
+        status = 400
+    elif errors:
+        status = 207
+    else:
+        status = 201
+    return jsonify({'inserted': inserted, 'errors': errors}), status
+
+@bp_routes.route('/import/csv', methods=['POST'])
+@jwt_required()
+def import_statement():
+    user_id = get_jwt_identity()
+    upload = request.files.get('file')
+    if upload is None:
+        return jsonify({'message': 'A CSV file is required in the "file" field.'}), 400
+
+    mapping = {key: request.form[key] for key in importer.DEFAULT_MAPPING if request.form.get(key)}
+    summary = importer.import_csv(user_id, upload.stream, mapping)
+    if 'stopped' not in summary:
+        status = 200
+    elif sum(summary['imported'].values()) or summary['duplicates']:
+        status = 207
+    else:
+        status = 400
+    return jsonify(summary), status
+
 @bp_routes.route('/expense/<int:id>', methods=['PUT'])
 @jwt_required()
 def update_expense(id):
-    data = request.json
     user_id = get_jwt_identity()
     expense = Expense.query.filter_by(id=id, user_id=user_id).first()
 
     if not expense:
         return jsonify({'message': 'Expense record not found'}), 404
 
-    try:
-        validated_data = expense_schema.load(data)
-    except ValidationError as err:
-        return jsonify(err.messages), 400
+    validated_data, errors = expense_validator.load_request(request)
+    if errors:
+        return jsonify(errors), 400
 
+    rollup.track(expense, -1)
     expense.amount = validated_data['amount']
     expense.category = validated_data['category']
     expense.date = validated_data['date']  # No need for strptime, it's already a date object
     expense.description = validated_data.get('description', expense.description)
+    rollup.track(expense)
 
-    db.session.commit()
+    batch.commit()
     return jsonify({'message': 'Expense updated successfully'}), 200
 
 @bp_routes.route('/expense/<int:id>', methods=['DELETE'])
@@ -151,72 +201,184 @@ def delete_expense(id):
     if not expense:
         return jsonify({'message': 'Expense record not found'}), 404
 
+    rollup.track(expense, -1)
     db.session.delete(expense)
-    db.session.commit()
+    batch.commit()
     return jsonify({'message': 'Expense deleted successfully'}), 200
 
+BULK_SCHEMAS = {
+    'income': (income_filter_schema, income_patch_schema),
+    'expense': (expense_filter_schema, expense_patch_schema),
+}
+
+def _bulk_filters(kind, data):
+    # An empty filter would touch every record, which is almost never meant.
+    if not isinstance(data, dict) or not data.get('filter'):
+        return None, {'filter': ['A non-empty filter is required.']}
+    try:
+        return BULK_SCHEMAS[kind][0].load(data['filter']), None
+    except ValidationError as err:
+        return None, {'filter': err.messages}
+
+def _bulk_update(kind):
+    data = request.json
+    filters, errors = _bulk_filters(kind, data)
+    if errors:
+        return jsonify(errors), 400
+    if not data.get('set'):
+        return jsonify({'set': ['At least one field to change is required.']}), 400
+    try:
+        changes = BULK_SCHEMAS[kind][1].load(data['set'])
+    except ValidationError as err:
+        return jsonify({'set': err.messages}), 400
+
+    updated = bulk.update_matching(kind, get_jwt_identity(), filters, changes)
+    batch.commit()
+    return jsonify({'updated': updated}), 200
+
+def _bulk_delete(kind):
+    filters, errors = _bulk_filters(kind, request.json)
+    if errors:
+        return jsonify(errors), 400
+
+    deleted = bulk.delete_matching(kind, get_jwt_identity(), filters)
+    batch.commit()
+    return jsonify({'deleted': deleted}), 200
+
+@bp_routes.route('/income', methods=['PATCH'])
+@jwt_required()
+def bulk_update_income():
+    return _bulk_update('income')
+
+@bp_routes.route('/income', methods=['DELETE'])
+@jwt_required()
+def bulk_delete_income():
+    return _bulk_delete('income')
+
+@bp_routes.route('/expense', methods=['PATCH'])
+@jwt_required()
+def bulk_update_expenses():
+    return _bulk_update('expense')
+
+@bp_routes.route('/expense', methods=['DELETE'])
+@jwt_required()
+def bulk_delete_expenses():
+    return _bulk_delete('expense')
+
 @bp_routes.route('/transactions', methods=['GET'])
 @jwt_required()
+@etags.conditional
+@cache.cached
 def get_transactions():
     user_id = get_jwt_identity()
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    category = request.args.get('category')
+    try:
+        filters = feed.parse_filters(request.args)
+    except ValueError:
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
 
-    incomes = Income.query.filter_by(user_id=user_id)
-    expenses = Expense.query.filter_by(user_id=user_id)
-    
-    if start_date and end_date:
-        try:
-            start_date = datetime.strptime(start_date, '%Y-%m-%d')
-            end_date = datetime.strptime(end_date, '%Y-%m-%d')
-            incomes = incomes.filter(Income.date >= start_date, Income.date <= end_date)
-            expenses = expenses.filter(Expense.date >= start_date, Expense.date <= end_date)
-        except ValueError:
-            return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
-
-    if category:
-        expenses = expenses.filter(Expense.category == category)
-
-    income_schema = IncomeSchema(many=True)
-    expense_schema = ExpenseSchema(many=True)
-    
-    transactions = {
-        'incomes': income_schema.dump(incomes.all()),
-        'expenses': expense_schema.dump(expenses.all())
-    }
+    limit = feed.parse_limit(request.args, feed.DEFAULT_LIMIT)
+    if limit is None:
+        return jsonify({'message': 'Invalid limit.'}), 400
 
-    return jsonify(transactions), 200
+    try:
+        transactions = feed.page(user_id, limit=limit, after=request.args.get('after'), **filters)
+    except feed.InvalidCursor:
+        return jsonify({'message': 'Invalid cursor.'}), 400
+
+    return serializers.response(transactions)
 
 @bp_routes.route('/recent_transactions', methods=['GET'])
 @jwt_required()
+@etags.conditional
+@cache.cached
 def get_recent_transactions():
     user_id = get_jwt_identity()
-    recent_incomes = Income.query.filter_by(user_id=user_id).order_by(Income.date.desc()).limit(5).all()
-    recent_expenses = Expense.query.filter_by(user_id=user_id).order_by(Expense.date.desc()).limit(5).all()
+    limit = feed.parse_limit(request.args, 5)
+    if limit is None:
+        return jsonify({'message': 'Invalid limit.'}), 400
 
-    income_schema = IncomeSchema(many=True)
-    expense_schema = ExpenseSchema(many=True)
+    return serializers.response(feed.page(user_id, limit=limit))
 
-    transactions = {
-        'recent_incomes': income_schema.dump(recent_incomes),
-        'recent_expenses': expense_schema.dump(recent_expenses)
-    }
+@bp_routes.route('/export', methods=['GET'])
+@jwt_required()
+def export_transactions():
+    user_id = get_jwt_identity()
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in export.FORMATS:
+        return jsonify({'message': 'Invalid format. Use ndjson or csv.'}), 400
 
-    return jsonify(transactions), 200
+    try:
+        filters = feed.parse_filters(request.args)
+    except ValueError:
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
+
+    encode, mimetype, filename = export.FORMATS[fmt]
+    items = feed.iter_feed(user_id, yield_per=export.BATCH_SIZE, **filters)
+    return Response(
+        stream_with_context(encode(items)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+@bp_routes.route('/analytics', methods=['GET'])
+@jwt_required()
+@etags.conditional
+def get_analytics():
+    user_id = get_jwt_identity()
+    granularity = request.args.get('granularity', 'month')
+    if granularity not in analytics.GRANULARITIES:
+        return jsonify({'message': 'Invalid granularity. Use day, week or month.'}), 400
+
+    window = request.args.get('window', default=analytics.DEFAULT_WINDOW, type=int)
+    if window is None or not 1 <= window <= analytics.MAX_WINDOW:
+        return jsonify({'message': f'Invalid window. Must be between 1 and {analytics.MAX_WINDOW}.'}), 400
+
+    try:
+        filters = feed.parse_filters(request.args)
+    except ValueError:
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
+
+    return serializers.response(analytics.summary(
+        user_id, granularity, window, start_date=filters['start_date'], end_date=filters['end_date']
+    ))
 
 @bp_routes.route('/balance', methods=['GET'])
 @jwt_required()
+@cache.cached
 def get_balance():
     user_id = get_jwt_identity()
-    total_income = sum(i.amount for i in Income.query.filter_by(user_id=user_id).all())
-    total_expenses = sum(e.amount for e in Expense.query.filter_by(user_id=user_id).all())
-    balance = total_income - total_expenses
+    balance = aggregates.balance(user_id)
+
+    return serializers.response({'balance': balance})
+
+@bp_routes.route('/balance/at', methods=['GET'])
+@jwt_required()
+@cache.cached
+def get_balance_at():
+    user_id = get_jwt_identity()
+    try:
+        day = datetime.strptime(request.args['date'], '%Y-%m-%d').date()
+    except (KeyError, ValueError):
+        return jsonify({'message': 'A date in YYYY-MM-DD format is required.'}), 400
+
+    return serializers.response({'date': day.isoformat(), 'balance': ledger.balance_at(user_id, day)})
+
+@bp_routes.route('/balance/history', methods=['GET'])
+@jwt_required()
+@etags.conditional
+@cache.cached
+def get_balance_history():
+    user_id = get_jwt_identity()
+    try:
+        filters = feed.parse_filters(request.args)
+    except ValueError:
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
 
-    return jsonify({'balance': balance}), 200
+    return serializers.response(ledger.history(user_id, filters['start_date'], filters['end_date']))
 
 @bp_routes.route('/monthly_summary', methods=['GET'])
 @jwt_required()
+@cache.cached
 def get_monthly_summary():
     user_id = get_jwt_identity()
     
@@ -228,29 +390,18 @@ def get_monthly_summary():
     if year < 1900 or year > datetime.utcnow().year:
         return jsonify({'message': 'Invalid year.'}), 400
 
-    start_of_month = datetime(year, month, 1)
-    end_of_month = datetime(year, month + 1, 1) - timedelta(days=1)
-
-    total_income = sum(i.amount for i in Income.query.filter_by(user_id=user_id).filter(Income.date >= start_of_month, Income.date <= end_of_month).all())
-    total_expenses = sum(e.amount for e in Expense.query.filter_by(user_id=user_id).filter(Expense.date >= start_of_month, Expense.date <= end_of_month).all())
+    summary = aggregates.monthly_summary(user_id, year, month)
 
-    summary = {
-        'total_income': total_income,
-        'total_expenses': total_expenses
-    }
-
-    return jsonify(summary), 200
+    return serializers.response(summary)
 
 @bp_routes.route('/budget', methods=['POST'])
 @jwt_required()
 def add_budget():
-    data = request.json
     user_id = get_jwt_identity()
 
-    try:
-        validated_data = BudgetSchema().load(data)
-    except ValidationError as err:
-        return jsonify(err.messages), 400
+    validated_data, errors = budget_validator.load_request(request)
+    if errors:
+        return jsonify(errors), 400
 
     new_budget = Budget(
         category=validated_data['category'],
@@ -260,7 +411,7 @@ def add_budget():
         user_id=user_id
     )
     db.session.add(new_budget)
-    db.session.commit()
+    batch.commit()
 
     return jsonify({'message': 'Budget added successfully'}), 201
 
@@ -268,17 +419,15 @@ def add_budget():
 @bp_routes.route('/budget/<int:id>', methods=['PUT'])
 @jwt_required()
 def update_budget(id):
-    data = request.json
     user_id = get_jwt_identity()
     budget = Budget.query.filter_by(id=id, user_id=user_id).first()
 
     if not budget:
         return jsonify({'message': 'Budget record not found'}), 404
 
-    try:
-        validated_data = budget_schema.load(data)
-    except ValidationError as err:
-        return jsonify(err.messages), 400
+    validated_data, errors = budget_validator.load_request(request)
+    if errors:
+        return jsonify(errors), 400
 
     # Update the budget fields with validated data
     budget.category = validated_data.get('category', budget.category)
@@ -286,7 +435,7 @@ def update_budget(id):
     budget.year = validated_data.get('year', budget.year)
     budget.month = validated_data.get('month', budget.month)
 
-    db.session.commit()
+    batch.commit()
     return jsonify({'message': 'Budget updated successfully'}), 200
 
 @bp_routes.route('/budget/<int:id>', methods=['DELETE'])
@@ -299,58 +448,60 @@ def delete_budget(id):
         return jsonify({'message': 'Budget record not found'}), 404
 
     db.session.delete(budget)
-    db.session.commit()
+    batch.commit()
     return jsonify({'message': 'Budget deleted successfully'}), 200
+@bp_routes.route('/budget/status', methods=['GET'])
+@jwt_required()
+@etags.conditional
+@cache.cached
+def get_budget_status():
+    user_id = get_jwt_identity()
+    year = request.args.get('year', type=int)
+    month = request.args.get('month', type=int)
+
+    if month is not None and (month < 1 or month > 12):
+        return jsonify({'message': 'Invalid month. Must be between 1 and 12.'}), 400
+
+    return serializers.response(aggregates.budget_status(user_id, year, month))
+
+def _budget_rows(user_id):
+    return (
+        select(Budget.id, Budget.category, Budget.limit, Budget.year, Budget.month)
+        .where(Budget.user_id == user_id)
+    )
+
 @bp_routes.route('/budget/<int:id>', methods=['GET'])
 @jwt_required()
+@cache.cached
 def get_budget(id):
     user_id = get_jwt_identity()
-    budget = Budget.query.filter_by(id=id, user_id=user_id).first()
+    row = db.session.execute(
+        _budget_rows(user_id).where(Budget.id == id)
+    ).first()
 
-    if not budget:
+    if not row:
         return jsonify({'message': 'Budget record not found'}), 404
 
-    budget_data = {
-        'id': budget.id,
-        'category': budget.category,
-        'limit': budget.limit,
-        'year': budget.year,
-        'month': budget.month
-    }
-
-    return jsonify(budget_data), 200
+    return serializers.response(serializers.Budget(*row))
 
 
 @bp_routes.route('/budget', methods=['GET'])
 @jwt_required()
+@etags.conditional
+@cache.cached
 def get_all_budgets():
     user_id = get_jwt_identity()
-    budgets = Budget.query.filter_by(user_id=user_id).all()
-
-    if not budgets:
-        return jsonify([]), 200  
-
-    budget_data = [
-        {
-            'id': budget.id,
-            'category': budget.category,
-            'limit': budget.limit,
-            'year': budget.year,
-            'month': budget.month
-        } for budget in budgets
-    ]
-    return jsonify(budget_data), 200
+    rows = db.session.execute(_budget_rows(user_id))
+    return serializers.response([serializers.Budget(*row) for row in rows])
 
 @bp_routes.route('/financial_goals', methods=['POST'])
 @jwt_required()
 def add_financial_goal():
-    data = request.json
     user_id = get_jwt_identity()
 
-    try:
-        validated_data = FinancialGoalSchema().load(data)  # Correct way to call load
-    except ValidationError as err:
-        return jsonify(err.messages), 400  # Return validation errors
+    validated_data, errors = financial_goal_validator.load_request(request)
+    if errors:
+        return jsonify(errors), 400
 
     new_goal = FinancialGoal(
         goal_name=validated_data['goal_name'],
@@ -360,30 +511,29 @@ def add_financial_goal():
         user_id=user_id
     )
     db.session.add(new_goal)
-    db.session.commit()
+    batch.commit()
 
     return jsonify({'message': 'Financial goal added successfully'}), 201
 
 @bp_routes.route('/financial_goals/<int:id>', methods=['PUT'])
 @jwt_required()
 def update_financial_goal(id):
-    data = request.json
     user_id = get_jwt_identity()
     goal = FinancialGoal.query.filter_by(id=id, user_id=user_id).first()
 
     if not goal:
         return jsonify({'message': 'Financial goal not found'}), 404
 
-    validated_data, validation_errors = FinancialGoalSchema().load(data)
+    validated_data, validation_errors = financial_goal_validator.load_request(request)
     if validation_errors:
         return jsonify(validation_errors), 400
 
     goal.goal_name = validated_data['goal_name']
     goal.target_amount = validated_data['target_amount']
     goal.current_amount = validated_data.get('current_amount', goal.current_amount)
-    goal.target_date = datetime.strptime(validated_data['target_date'], '%Y-%m-%d').date()
+    goal.target_date = validated_data['target_date']
 
-    db.session.commit()
+    batch.commit()
     return jsonify({'message': 'Financial goal updated successfully'}), 200
 
 @bp_routes.route('/financial_goals/<int:id>', methods=['DELETE'])
@@ -396,13 +546,49 @@ def delete_financial_goal(id):
         return jsonify({'message': 'Financial goal not found'}), 404
 
     db.session.delete(goal)
-    db.session.commit()
+    batch.commit()
     return jsonify({'message': 'Financial goal deleted successfully'}), 200
 
 @bp_routes.route('/financial_goals', methods=['GET'])
 @jwt_required()
+@etags.conditional
+@cache.cached
 def get_financial_goals():
     user_id = get_jwt_identity()
-    goals = FinancialGoal.query.filter_by(user_id=user_id).all()
-    goal_schema = FinancialGoalSchema(many=True)
-    return jsonify(goal_schema.dump(goals)), 200
+    rows = db.session.execute(
+        select(FinancialGoal.id, FinancialGoal.goal_name, FinancialGoal.target_amount,
+               FinancialGoal.current_amount, FinancialGoal.target_date)
+        .where(FinancialGoal.user_id == user_id)
+    )
+    return serializers.response([serializers.FinancialGoal(*row) for row in rows])
+
+@bp_routes.route('/financial_goals/projections', methods=['GET'])
+@jwt_required()
+def get_goal_projections():
+    user_id = get_jwt_identity()
+    return serializers.response(projections.projections(user_id))
+
+@bp_routes.route('/batch', methods=['POST'])
+@jwt_required()
+def run_batch():
+    data = request.json
+    if isinstance(data, list):
+        data = {'operations': data}
+    if not isinstance(data, dict) or not isinstance(data.get('operations'), list):
+        return jsonify({"error": "Expected a list of operations"}), 400
+
+    operations = data['operations']
+    limit = current_app.config['BATCH_MAX_OPERATIONS']
+    if len(operations) > limit:
+        return jsonify({"error": f"At most {limit} operations per batch"}), 400
+
+    prefix = request.path[:-len('/batch')]
+    results, committed = batch.run(operations, prefix, atomic=data.get('atomic', True) is not False)
+    failed = sum(result['status'] >= 400 for result in results)
+    if not committed or failed == len(results) and results:
+        status = 400
+    elif failed:
+        status = 207
+    else:
+        status = 200
+    return jsonify({'committed': committed, 'results': results}), status
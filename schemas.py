@@ -1,14 +1,20 @@
+import datetime
+import math
+from typing import Union
+import msgspec
 from marshmallow import Schema, fields, validate, ValidationError
+from typing_extensions import Annotated
 
 class UserSchema(Schema):
     username = fields.Str(required=True, validate=validate.Length(min=1))
     email = fields.Email(required=True)
     password = fields.Str(required=True, validate=validate.Length(min=6))
 
+user_schema = UserSchema()
+
 def validate_user(data):
-    schema = UserSchema()
     try:
-        validated_data = schema.load(data)
+        validated_data = user_schema.load(data)
         return validated_data, None
     except ValidationError as err:
         return None, err.messages
@@ -18,12 +24,7 @@ class IncomeSchema(Schema):
     date = fields.Date(required=True)
     description = fields.Str()
 def validate_income(data):
-    schema = IncomeSchema()
-    try:
-        validated_data = schema.load(data)
-        return validated_data, None
-    except ValidationError as err:
-        return None, err.messages
+    return income_validator.load(data)
 class ExpenseSchema(Schema):
     amount = fields.Float(required=True, validate=validate.Range(min=0))
     category = fields.Str(required=True, validate=validate.Length(min=1))
@@ -31,12 +32,7 @@ class ExpenseSchema(Schema):
     description = fields.Str()  
 
 def validate_expense(data):
-    schema = ExpenseSchema()
-    try:
-        validated_data = schema.load(data)
-        return validated_data, None
-    except ValidationError as err:
-        return None, err.messages
+    return expense_validator.load(data)
 class BudgetSchema(Schema):
     category = fields.String(required=True)
     limit = fields.Float(required=True)
@@ -44,21 +40,152 @@ class BudgetSchema(Schema):
     month = fields.Integer(required=True)
 
 def validate_budget(data):
-    schema = BudgetSchema()
-    try:
-        validated_data = schema.load(data)
-        return validated_data, None
-    except ValidationError as err:
-        return None, err.messages
+    return budget_validator.load(data)
 class FinancialGoalSchema(Schema):
     goal_name = fields.String(required=True)
     target_amount = fields.Float(required=True)
     current_amount = fields.Float(missing=0)  
     target_date = fields.Date(required=True, format='%Y-%m-%d')
 def validate_financial_goal(data):
-    schema = FinancialGoalSchema()
-    try:
-        validated_data = schema.load(data)
-        return validated_data, None
-    except ValidationError as err:
-        return None, err.messages
+    return financial_goal_validator.load(data)
+
+
+# Typed mirrors of the schemas above. They accept a strict subset of what the
+# schemas accept (no numeric strings, no unknown fields), so a body that fails
+# here is handed to the marshmallow schema, which either loads it or produces
+# its usual {field: [message]} errors.
+class IncomeStruct(msgspec.Struct, forbid_unknown_fields=True):
+    amount: float
+    source: str
+    date: datetime.date
+    description: Union[str, msgspec.UnsetType] = msgspec.UNSET
+
+
+class ExpenseStruct(msgspec.Struct, forbid_unknown_fields=True):
+    amount: Annotated[float, msgspec.Meta(ge=0)]
+    category: Annotated[str, msgspec.Meta(min_length=1)]
+    date: datetime.date
+    description: Union[str, msgspec.UnsetType] = msgspec.UNSET
+
+
+class BudgetStruct(msgspec.Struct, forbid_unknown_fields=True):
+    category: str
+    limit: float
+    year: int
+    month: int
+
+
+class FinancialGoalStruct(msgspec.Struct, forbid_unknown_fields=True):
+    goal_name: str
+    target_amount: float
+    target_date: datetime.date
+    current_amount: Union[float, msgspec.UnsetType] = msgspec.UNSET
+
+
+class Validator:
+    def __init__(self, struct, schema, defaults=None):
+        self.struct = struct
+        self.schema = schema
+        self.batch_schema = schema.__class__(many=True)
+        self.defaults = defaults or {}
+        self.decoder = msgspec.json.Decoder(struct)
+        self.float_fields = [name for name, field in schema.fields.items() if isinstance(field, fields.Float)]
+
+    def _as_dict(self, obj):
+        data = dict(self.defaults)
+        for name in obj.__struct_fields__:
+            value = getattr(obj, name)
+            if value is not msgspec.UNSET:
+                data[name] = value
+        # msgspec.convert lets inf/nan through; the schemas reject them.
+        for name in self.float_fields:
+            if name in data and not math.isfinite(data[name]):
+                return None
+        return data
+
+    def _fast(self, data):
+        try:
+            return self._as_dict(msgspec.convert(data, self.struct))
+        except msgspec.ValidationError:
+            return None
+
+    def load(self, data):
+        loaded = self._fast(data)
+        if loaded is not None:
+            return loaded, None
+        try:
+            return self.schema.load(data), None
+        except ValidationError as err:
+            return None, err.messages
+
+    def load_request(self, request):
+        # Decode and validate the raw body in one pass; anything unusual
+        # (wrong content type, bad JSON, invalid fields) takes the
+        # request.json + schema path so responses are unchanged.
+        if request.is_json:
+            try:
+                loaded = self._as_dict(self.decoder.decode(request.get_data()))
+            except (msgspec.ValidationError, msgspec.DecodeError):
+                loaded = None
+            if loaded is not None:
+                return loaded, None
+        return self.load(request.json)
+
+    def load_many(self, rows):
+        # Returns {index: data} and {index: errors}, checking rows one by one
+        # and loading the leftovers through the schema in a single call.
+        valid = {}
+        slow = []
+        for index, row in enumerate(rows):
+            loaded = self._fast(row)
+            if loaded is None:
+                slow.append(index)
+            else:
+                valid[index] = loaded
+
+        errors = {}
+        if slow:
+            # marshmallow keys per-row errors by position.
+            try:
+                loaded = self.batch_schema.load([rows[index] for index in slow])
+                failed = {}
+            except ValidationError as err:
+                loaded = err.valid_data if isinstance(err.valid_data, list) else []
+                failed = err.messages if isinstance(err.messages, dict) else {}
+            for position, index in enumerate(slow):
+                if position in failed:
+                    errors[index] = failed[position]
+                elif position < len(loaded):
+                    valid[index] = loaded[position]
+                else:
+                    errors[index] = {'_schema': ['Invalid input type.']}
+        return valid, errors
+
+
+income_validator = Validator(IncomeStruct, IncomeSchema())
+expense_validator = Validator(ExpenseStruct, ExpenseSchema())
+budget_validator = Validator(BudgetStruct, BudgetSchema())
+financial_goal_validator = Validator(FinancialGoalStruct, FinancialGoalSchema(), defaults={'current_amount': 0})
+
+
+# Filters for set-based updates and deletes; every field narrows the match.
+class ExpenseFilterSchema(Schema):
+    start_date = fields.Date()
+    end_date = fields.Date()
+    category = fields.Str()
+    min_amount = fields.Float()
+    max_amount = fields.Float()
+
+class IncomeFilterSchema(Schema):
+    start_date = fields.Date()
+    end_date = fields.Date()
+    source = fields.Str()
+    min_amount = fields.Float()
+    max_amount = fields.Float()
+
+
+expense_filter_schema = ExpenseFilterSchema()
+income_filter_schema = IncomeFilterSchema()
+# Patches take any subset of a record's fields.
+expense_patch_schema = ExpenseSchema(partial=True)
+income_patch_schema = IncomeSchema(partial=True)
@@ -0,0 +1,153 @@
+import math
+import random
+import time
+import click
+from datetime import date, timedelta
+from sqlalchemy import func, select
+from app import db, hasher
+from models import User, Income, Expense, Budget, FinancialGoal
+import dialects
+import ledger
+import rollup
+
+# Category: (share of expenses, median amount). Rent is paid monthly on top.
+EXPENSE_CATEGORIES = {
+    'Food': (0.35, 18.0),
+    'Transport': (0.15, 12.0),
+    'Shopping': (0.15, 45.0),
+    'Utilities': (0.10, 80.0),
+    'Fun': (0.10, 30.0),
+    'Health': (0.05, 60.0),
+    'Travel': (0.05, 250.0),
+    'Other': (0.05, 25.0),
+}
+DESCRIPTIONS = {
+    'Food': ['Groceries', 'Lunch', 'Coffee', 'Takeaway', 'Restaurant'],
+    'Transport': ['Bus pass', 'Fuel', 'Taxi', 'Train ticket', 'Parking'],
+    'Shopping': ['Clothes', 'Electronics', 'Books', 'Household'],
+    'Utilities': ['Electricity', 'Water', 'Internet', 'Phone'],
+    'Fun': ['Cinema', 'Concert', 'Streaming', 'Games'],
+    'Health': ['Pharmacy', 'Dentist', 'Gym'],
+    'Travel': ['Flight', 'Hotel', 'Car hire'],
+    'Other': ['Gift', 'Donation', 'Misc'],
+}
+FREELANCE_SOURCES = ['Freelance', 'Interest', 'Dividends', 'Refund']
+GOAL_NAMES = ['Emergency fund', 'Holiday', 'New car', 'House deposit', 'Wedding', 'New laptop', 'Pay off card']
+
+
+def _months(first_day, last_day):
+    month = first_day.replace(day=1)
+    while month <= last_day:
+        yield month
+        month = (month + timedelta(days=31)).replace(day=1)
+
+
+def _user_rows(rng, user_id, n_transactions, first_day, last_day):
+    days = (last_day - first_day).days + 1
+    day = lambda: first_day + timedelta(days=rng.randrange(days))
+    months = list(_months(first_day, last_day))
+    salary = round(rng.uniform(2000, 8000), -1)
+    payday = rng.randint(1, 28)
+    rent = round(salary * rng.uniform(0.2, 0.35), 2)
+
+    incomes = [
+        {'amount': salary, 'source': 'Salary', 'date': month.replace(day=payday),
+         'description': 'Monthly salary', 'user_id': user_id}
+        for month in months if first_day <= month.replace(day=payday) <= last_day
+    ]
+    expenses = [
+        {'amount': rent, 'category': 'Rent', 'date': month, 'description': 'Rent', 'user_id': user_id}
+        for month in months if month >= first_day
+    ]
+    n_other = max(n_transactions - len(incomes) - len(expenses), 0)
+    n_side = n_other // 20
+    incomes += [
+        {'amount': round(rng.lognormvariate(math.log(300), 0.8), 2), 'source': rng.choice(FREELANCE_SOURCES),
+         'date': day(), 'description': '', 'user_id': user_id}
+        for _ in range(n_side)
+    ]
+    categories = rng.choices(list(EXPENSE_CATEGORIES), [share for share, _ in EXPENSE_CATEGORIES.values()],
+                             k=n_other - n_side)
+    expenses += [
+        {'amount': round(rng.lognormvariate(math.log(EXPENSE_CATEGORIES[category][1]), 0.6), 2),
+         'category': category, 'date': day(), 'description': rng.choice(DESCRIPTIONS[category]),
+         'user_id': user_id}
+        for category in categories
+    ]
+
+    # Budgets for the most recent year, near what the user usually spends.
+    per_month = len(categories) / len(months)
+    budgets = [
+        {'category': category, 'year': month.year, 'month': month.month, 'user_id': user_id,
+         'limit': round(per_month * EXPENSE_CATEGORIES[category][0] * EXPENSE_CATEGORIES[category][1]
+                        * rng.uniform(0.9, 1.4), -1) or 50.0}
+        for month in months[-12:]
+        for category in rng.sample(list(EXPENSE_CATEGORIES), 4)
+    ]
+    goals = []
+    for name in rng.sample(GOAL_NAMES, rng.randint(0, 3)):
+        target = round(rng.uniform(1000, 30000), -2)
+        goals.append({'goal_name': name, 'target_amount': target,
+                      'current_amount': round(target * rng.uniform(0, 0.8), 2),
+                      'target_date': date.today() + timedelta(days=rng.randint(90, 1100)), 'user_id': user_id})
+    return incomes, expenses, budgets, goals
+
+
+def seed(n_users, n_transactions, days=730, prefix='user', start=0, password='password123',
+         batch_size=100, random_seed=0, echo=None):
+    rng = random.Random(random_seed)
+    last_day = date.today()
+    first_day = last_day - timedelta(days=days - 1)
+    # One hash for everyone; hashing per user would dominate large seeds.
+    password_hash = hasher.hash(password)
+    connection = db.session.connection()
+    started = time.perf_counter()
+    rows_written = 0
+
+    for batch_start in range(start, start + n_users, batch_size):
+        names = [f'{prefix}{n}' for n in range(batch_start, min(batch_start + batch_size, start + n_users))]
+        connection.execute(dialects.insert(User.__table__), [
+            {'username': name, 'email': f'{name}@example.com', 'password': password_hash} for name in names
+        ])
+        user_ids = connection.execute(select(User.id).where(User.username.in_(names))).scalars().all()
+
+        tables = {Income: [], Expense: [], Budget: [], FinancialGoal: []}
+        for user_id in user_ids:
+            for model, rows in zip(tables, _user_rows(rng, user_id, n_transactions, first_day, last_day)):
+                tables[model].extend(rows)
+        for model, rows in tables.items():
+            if rows:
+                connection.execute(dialects.insert(model.__table__), rows)
+        # Only the users just written, so existing users are left alone and
+        # the work grows with the seed rather than the database.
+        rollup.rebuild(user_ids=user_ids)
+        ledger.rebuild(user_ids=user_ids)
+        db.session.commit()
+        connection = db.session.connection()
+
+        rows_written += len(tables[Income]) + len(tables[Expense])
+        if echo is not None:
+            done = batch_start + len(names) - start
+            echo(f'{done}/{n_users} users, {rows_written} transactions '
+                 f'({rows_written / (time.perf_counter() - started):.0f} rows/s)')
+
+    return rows_written
+
+
+@click.command('seed')
+@click.option('--users', type=int, default=100, show_default=True)
+@click.option('--transactions', type=int, default=1000, show_default=True, help='Per user.')
+@click.option('--days', type=int, default=730, show_default=True, help='History length, ending today.')
+@click.option('--prefix', default='user', show_default=True, help='Usernames are <prefix><n>.')
+@click.option('--start', type=int, default=0, show_default=True, help='First <n>, to add users to a seeded database.')
+@click.option('--password', default='password123', show_default=True, help='Password of every seeded user.')
+@click.option('--batch-size', type=int, default=100, show_default=True, help='Users per transaction.')
+@click.option('--seed', 'random_seed', type=int, default=0, show_default=True)
+def seed_command(users, transactions, days, prefix, start, password, batch_size, random_seed):
+    """Bulk-generate users with incomes, expenses, budgets and goals."""
+    taken = db.session.execute(
+        select(func.count()).select_from(User).where(User.username == f'{prefix}{start}')
+    ).scalar()
+    if taken:
+        raise click.UsageError(f'User {prefix}{start} already exists; pass another --prefix or --start.')
+    seed(users, transactions, days, prefix, start, password, batch_size, random_seed, echo=click.echo)
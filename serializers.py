@@ -0,0 +1,74 @@
+import datetime
+from typing import Optional
+import msgspec
+from flask import current_app
+
+# Response shapes for the read endpoints. Rows from Core selects are passed
+# positionally, so field order matches the column order of those selects.
+
+
+class Income(msgspec.Struct, tag='income', tag_field='type'):
+    id: int
+    date: datetime.date
+    amount: float
+    source: str
+    description: Optional[str]
+
+
+class Expense(msgspec.Struct, tag='expense', tag_field='type'):
+    id: int
+    date: datetime.date
+    amount: float
+    category: str
+    description: Optional[str]
+
+
+class Budget(msgspec.Struct):
+    id: int
+    category: str
+    limit: float
+    year: int
+    month: int
+
+
+class BudgetStatus(msgspec.Struct):
+    id: int
+    category: str
+    year: int
+    month: int
+    limit: float
+    spent: float
+    remaining: float
+    percent_used: Optional[float]
+
+
+class FinancialGoal(msgspec.Struct):
+    id: int
+    goal_name: str
+    target_amount: float
+    current_amount: Optional[float]
+    target_date: datetime.date
+
+
+class BalancePoint(msgspec.Struct):
+    date: datetime.date
+    balance: float
+
+
+class GoalProjection(msgspec.Struct):
+    id: int
+    goal_name: str
+    target_amount: float
+    current_amount: float
+    target_date: datetime.date
+    remaining: float
+    required_monthly: float
+    projected_completion: Optional[datetime.date]
+    on_track: bool
+
+
+encoder = msgspec.json.Encoder()
+
+
+def response(obj, status=200):
+    return current_app.response_class(encoder.encode(obj), status=status, mimetype='application/json')
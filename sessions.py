@@ -0,0 +1,185 @@
+import heapq
+import os
+import sqlite3
+import threading
+import time
+from flask_session.base import ServerSideSession, ServerSideSessionInterface
+from flask_session.defaults import Defaults
+
+
+class MemorySessionStore:
+    # Sessions in a dict, with a heap ordered by expiry so a sweep only
+    # touches sessions that have actually expired.
+    def __init__(self):
+        self._sessions = {}
+        self._expiry = []
+        self._lock = threading.Lock()
+
+    def load(self, store_id, now):
+        item = self._sessions.get(store_id)
+        if item is None or item[0] <= now:
+            return None
+        return item
+
+    def save(self, store_id, data, expires):
+        with self._lock:
+            self._sessions[store_id] = (expires, data)
+            heapq.heappush(self._expiry, (expires, store_id))
+
+    def delete(self, store_id):
+        with self._lock:
+            self._sessions.pop(store_id, None)
+
+    def sweep(self, now):
+        removed = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                expires, store_id = heapq.heappop(self._expiry)
+                item = self._sessions.get(store_id)
+                # Stale heap entry if the session was saved again since.
+                if item is not None and item[0] == expires:
+                    del self._sessions[store_id]
+                    removed += 1
+        return removed
+
+
+class SqliteSessionStore:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS sessions ('
+                'id TEXT PRIMARY KEY, data BLOB NOT NULL, expires REAL NOT NULL) WITHOUT ROWID'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_sessions_expires ON sessions (expires)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def load(self, store_id, now):
+        row = self._connect().execute(
+            'SELECT expires, data FROM sessions WHERE id = ? AND expires > ?', (store_id, now)
+        ).fetchone()
+        return row
+
+    def save(self, store_id, data, expires):
+        self._connect().execute(
+            'INSERT INTO sessions (id, data, expires) VALUES (?, ?, ?) '
+            'ON CONFLICT (id) DO UPDATE SET data = excluded.data, expires = excluded.expires',
+            (store_id, data, expires)
+        )
+
+    def delete(self, store_id):
+        self._connect().execute('DELETE FROM sessions WHERE id = ?', (store_id,))
+
+    def sweep(self, now):
+        return self._connect().execute('DELETE FROM sessions WHERE expires <= ?', (now,)).rowcount
+
+
+class StoredSession(ServerSideSession):
+    stored_expires = None
+    stored_blob = None
+
+
+class StoreSessionInterface(ServerSideSessionInterface):
+    session_class = StoredSession
+    # Expiry is enforced on read and by the sweeper thread, not per request.
+    ttl = True
+
+    def __init__(self, app, store, sweep_interval=60, **kwargs):
+        super().__init__(app, **kwargs)
+        self.store = store
+        self.sweep_interval = sweep_interval
+        self._sweeper_pid = None
+        self._sweeper_lock = threading.Lock()
+
+    def _start_sweeper(self):
+        # One daemon per worker process; started lazily so it survives forking.
+        if self._sweeper_pid == os.getpid() or not self.sweep_interval:
+            return
+        with self._sweeper_lock:
+            if self._sweeper_pid == os.getpid():
+                return
+            self._sweeper_pid = os.getpid()
+            threading.Thread(target=self._sweep_forever, name='session-sweeper', daemon=True).start()
+
+    def _sweep_forever(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                self.store.sweep(time.time())
+            except Exception:
+                self.app.logger.exception('Session sweep failed')
+
+    def open_session(self, app, request):
+        self._start_sweeper()
+        session = super().open_session(app, request)
+        stored = dict.pop(session, '_stored', None)
+        if stored is not None:
+            session.stored_expires, session.stored_blob = stored
+        return session
+
+    def _retrieve_session_data(self, store_id):
+        item = self.store.load(store_id, time.time())
+        if item is None:
+            return None
+        expires, blob = item
+        data = self.serializer.decode(blob)
+        # Picked back off the session by open_session.
+        data['_stored'] = (expires, blob)
+        return data
+
+    def should_set_storage(self, app, session):
+        blob = self.serializer.encode(session)
+        if blob != session.stored_blob:
+            return True
+        # Unchanged: only write to slide the expiry once half the lifetime is used.
+        if app.config['SESSION_REFRESH_EACH_REQUEST'] and session.stored_expires is not None:
+            lifetime = app.permanent_session_lifetime.total_seconds()
+            return session.stored_expires - time.time() < lifetime / 2
+        return False
+
+    def _upsert_session(self, session_lifetime, session, store_id):
+        expires = time.time() + session_lifetime.total_seconds()
+        blob = self.serializer.encode(session)
+        self.store.save(store_id, blob, expires)
+        session.stored_expires = expires
+        session.stored_blob = blob
+
+    def _delete_session(self, store_id):
+        self.store.delete(store_id)
+
+    def _delete_expired_sessions(self):
+        self.store.sweep(time.time())
+
+
+STORES = {
+    'memory': lambda app: MemorySessionStore(),
+    'sqlite': lambda app: SqliteSessionStore(
+        app.config.get('SESSION_SQLITE_PATH') or os.path.join(app.instance_path, 'sessions.db')
+    ),
+}
+
+
+def init_app(app):
+    config = app.config
+    app.session_interface = StoreSessionInterface(
+        app,
+        STORES[config['SESSION_TYPE']](app),
+        sweep_interval=config.get('SESSION_SWEEP_INTERVAL', 60),
+        key_prefix=config.get('SESSION_KEY_PREFIX', Defaults.SESSION_KEY_PREFIX),
+        use_signer=config.get('SESSION_USE_SIGNER', Defaults.SESSION_USE_SIGNER),
+        permanent=config.get('SESSION_PERMANENT', Defaults.SESSION_PERMANENT),
+        sid_length=config.get('SESSION_ID_LENGTH', Defaults.SESSION_ID_LENGTH),
+        serialization_format=config.get('SESSION_SERIALIZATION_FORMAT', Defaults.SESSION_SERIALIZATION_FORMAT),
+    )
@@ -0,0 +1,47 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from config import Config
+
+
+@pytest.fixture
+def app(tmp_path):
+    from app import create_app, db
+    import models  # noqa: F401
+
+    class TestConfig(Config):
+        TESTING = True
+        SECRET_KEY = 'test'
+        JWT_SECRET_KEY = 'test-jwt-secret-at-least-32-bytes'
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path}/test.db'
+        SESSION_TYPE = 'memory'
+        CACHE_TYPE = 'null'
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user_id(app):
+    from app import db
+    from models import User
+
+    with app.app_context():
+        user = User(username='tester', email='tester@example.com', password='x')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+@pytest.fixture
+def headers(app, user_id):
+    with app.app_context():
+        return {'Authorization': 'Bearer ' + create_access_token(identity=user_id)}
@@ -0,0 +1,82 @@
+import pytest
+import ledger
+import rollup
+import versions
+from models import Expense, Income
+
+
+@pytest.fixture
+def expense_id(app, client, headers):
+    response = client.post('/routes/expense', json={'amount': 40, 'category': 'Food', 'date': '2024-05-01'}, headers=headers)
+    assert response.status_code == 201
+    with app.app_context():
+        return Expense.query.one().id
+
+
+def _state(app, user_id):
+    with app.app_context():
+        return (
+            versions.current(user_id),
+            sorted((e.amount, e.category, e.date.isoformat()) for e in Expense.query.all()),
+            Income.query.count(),
+            ledger.balance_at(user_id),
+        )
+
+
+def test_failed_operation_rolls_back_the_whole_batch(app, client, headers, user_id, expense_id):
+    before = _state(app, user_id)
+    response = client.post('/routes/batch', json={'operations': [
+        {'method': 'POST', 'path': '/income', 'body': {'amount': 500, 'source': 'Salary', 'date': '2024-05-02'}},
+        {'method': 'PUT', 'path': f'/expense/{expense_id}', 'body': {'amount': 55, 'category': 'Fun', 'date': '2024-06-01'}},
+        {'method': 'POST', 'path': '/expense', 'body': {'amount': -5, 'category': 'Food', 'date': '2024-05-03'}},
+        {'method': 'DELETE', 'path': f'/expense/{expense_id}'},
+    ]}, headers=headers)
+
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body['committed'] is False
+    assert [result['status'] for result in body['results']] == [201, 200, 400]
+    assert _state(app, user_id) == before
+    with app.app_context():
+        assert ledger.verify(user_id) == []
+        assert rollup.verify(user_id) == []
+
+
+def test_unknown_route_fails_the_batch(app, client, headers, user_id, expense_id):
+    before = _state(app, user_id)
+    response = client.post('/routes/batch', json=[
+        {'method': 'DELETE', 'path': f'/expense/{expense_id}'},
+        {'method': 'DELETE', 'path': '/expense/999999'},
+    ], headers=headers)
+
+    assert response.status_code == 400
+    assert [result['status'] for result in response.get_json()['results']] == [200, 404]
+    assert _state(app, user_id) == before
+
+
+def test_successful_batch_commits_every_operation(app, client, headers, user_id, expense_id):
+    version = _state(app, user_id)[0]
+    response = client.post('/routes/batch', json={'operations': [
+        {'method': 'POST', 'path': '/income', 'body': {'amount': 500, 'source': 'Salary', 'date': '2024-05-02'}},
+        {'method': 'PUT', 'path': f'/expense/{expense_id}', 'body': {'amount': 55, 'category': 'Fun', 'date': '2024-06-01'}},
+    ]}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['committed'] is True
+    state = _state(app, user_id)
+    assert state[0] > version
+    assert state[1:] == ([(55, 'Fun', '2024-06-01')], 1, 445)
+    with app.app_context():
+        assert ledger.verify(user_id) == []
+        assert rollup.verify(user_id) == []
+
+
+def test_non_atomic_batch_keeps_the_successful_operations(app, client, headers, user_id):
+    response = client.post('/routes/batch', json={'atomic': False, 'operations': [
+        {'method': 'POST', 'path': '/income', 'body': {'amount': 500, 'source': 'Salary', 'date': '2024-05-02'}},
+        {'method': 'POST', 'path': '/income', 'body': {'amount': 'lots', 'source': 'Salary', 'date': '2024-05-02'}},
+    ]}, headers=headers)
+
+    assert response.status_code == 207
+    assert [result['status'] for result in response.get_json()['results']] == [201, 400]
+    assert _state(app, user_id)[2] == 1
@@ -0,0 +1,83 @@
+import pytest
+import ledger
+import rollup
+from models import Expense, Income
+
+
+@pytest.fixture
+def rows(client, headers):
+    response = client.post('/routes/expense', json=[
+        {'amount': 10, 'category': 'Food', 'date': '2024-01-05'},
+        {'amount': 10, 'category': 'Food', 'date': '2024-01-05'},
+        {'amount': 35, 'category': 'Food', 'date': '2024-02-11'},
+        {'amount': 90, 'category': 'Travel', 'date': '2024-02-11'},
+        {'amount': 700, 'category': 'Rent', 'date': '2024-03-01'},
+    ], headers=headers)
+    assert response.status_code == 201
+    for body in (
+        {'amount': 2500, 'source': 'Salary', 'date': '2024-01-31'},
+        {'amount': 2500, 'source': 'Salary', 'date': '2024-02-29'},
+        {'amount': 120, 'source': 'Refund', 'date': '2024-02-11'},
+    ):
+        assert client.post('/routes/income', json=body, headers=headers).status_code == 201
+
+
+def _consistent(app, user_id):
+    with app.app_context():
+        return rollup.verify(user_id) == [] and ledger.verify(user_id) == []
+
+
+@pytest.mark.parametrize('kind, body, updated', [
+    ('expense', {'filter': {'category': 'Food'}, 'set': {'category': 'Groceries'}}, 3),
+    ('expense', {'filter': {'start_date': '2024-02-01', 'end_date': '2024-02-29'}, 'set': {'date': '2024-04-01'}}, 2),
+    ('expense', {'filter': {'max_amount': 10}, 'set': {'amount': 12.5}}, 2),
+    ('expense', {'filter': {'min_amount': 50}, 'set': {'amount': 100, 'category': 'Misc', 'date': '2024-05-05'}}, 2),
+    ('expense', {'filter': {'category': 'Nothing'}, 'set': {'amount': 1}}, 0),
+    ('income', {'filter': {'source': 'Salary'}, 'set': {'amount': 2600}}, 2),
+    ('income', {'filter': {'end_date': '2024-02-15'}, 'set': {'source': 'Other', 'date': '2024-06-30'}}, 2),
+])
+def test_bulk_update(app, client, headers, user_id, rows, kind, body, updated):
+    response = client.patch(f'/routes/{kind}', json=body, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json() == {'updated': updated}
+    assert _consistent(app, user_id)
+
+
+@pytest.mark.parametrize('kind, filters, deleted, left', [
+    ('expense', {'category': 'Food'}, 3, 2),
+    ('expense', {'start_date': '2024-02-11', 'end_date': '2024-02-11'}, 2, 3),
+    ('expense', {'min_amount': 10, 'max_amount': 35}, 3, 2),
+    ('expense', {'start_date': '2025-01-01'}, 0, 5),
+    ('income', {'source': 'Salary'}, 2, 1),
+    ('income', {'min_amount': 1000, 'end_date': '2024-01-31'}, 1, 2),
+])
+def test_bulk_delete(app, client, headers, user_id, rows, kind, filters, deleted, left):
+    response = client.delete(f'/routes/{kind}', json={'filter': filters}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json() == {'deleted': deleted}
+    with app.app_context():
+        assert {'expense': Expense, 'income': Income}[kind].query.count() == left
+    assert _consistent(app, user_id)
+
+
+def test_bulk_changes_move_balances(client, headers, rows):
+    client.patch('/routes/expense', json={'filter': {'category': 'Rent'}, 'set': {'date': '2024-01-02'}}, headers=headers)
+    client.delete('/routes/income', json={'filter': {'source': 'Refund'}}, headers=headers)
+    balance = client.get('/routes/balance/at?date=2024-01-31', headers=headers).get_json()['balance']
+    assert balance == 2500 - 700 - 20
+    balance = client.get('/routes/balance/at?date=2024-12-31', headers=headers).get_json()['balance']
+    assert balance == 5000 - 845
+
+
+@pytest.mark.parametrize('method, body', [
+    ('PATCH', {'filter': {}, 'set': {'amount': 1}}),
+    ('PATCH', {'filter': {'category': 'Food'}, 'set': {}}),
+    ('PATCH', {'filter': {'category': 'Food'}, 'set': {'amount': -1}}),
+    ('DELETE', {'filter': {}}),
+    ('DELETE', {'filter': {'start_date': 'soon'}}),
+])
+def test_bulk_rejects_bad_requests(app, client, headers, user_id, rows, method, body):
+    response = client.open('/routes/expense', method=method, json=body, headers=headers)
+    assert response.status_code == 400
+    with app.app_context():
+        assert Expense.query.count() == 5
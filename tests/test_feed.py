@@ -0,0 +1,60 @@
+from datetime import date
+import pytest
+from models import Expense, Income
+
+SAME_DAY = date(2024, 6, 1)
+
+
+@pytest.fixture
+def rows(app, user_id):
+    # Incomes and expenses with the same ids 1-6 on one day, so only the
+    # rank tiebreak orders them, plus rows on the days either side.
+    from app import db
+
+    with app.app_context():
+        for id in range(1, 7):
+            db.session.add(Income(id=id, amount=id, source='Salary', date=SAME_DAY, user_id=user_id))
+            db.session.add(Expense(id=id, amount=id, category='Food', date=SAME_DAY, user_id=user_id))
+        db.session.add_all([
+            Income(id=7, amount=7, source='Gift', date=date(2024, 6, 2), user_id=user_id),
+            Expense(id=7, amount=7, category='Food', date=date(2024, 5, 31), user_id=user_id),
+            Expense(id=8, amount=8, category='Rent', date=SAME_DAY, user_id=user_id),
+        ])
+        db.session.commit()
+
+
+def _walk(client, headers, limit, query=''):
+    keys, after, pages = [], None, 0
+    while True:
+        path = f'/routes/transactions?limit={limit}{query}' + (f'&after={after}' if after else '')
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200
+        body = response.get_json()
+        keys += [(item['date'], item['id'], item['type']) for item in body['transactions']]
+        after = body['next_cursor']
+        pages += 1
+        assert pages <= 20
+        if after is None:
+            return keys
+
+
+def _expected(items):
+    # (date, id, rank) descending, income ranking above expense.
+    return sorted(items, key=lambda key: (key[0], key[1], key[2] == 'income'), reverse=True)
+
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 4, 5, 7, 50])
+def test_pages_never_skip_or_repeat_rows(client, headers, rows, limit):
+    keys = _walk(client, headers, limit)
+    assert len(keys) == len(set(keys)) == 15
+    assert keys == _expected(keys)
+    assert keys[:3] == [('2024-06-02', 7, 'income'), ('2024-06-01', 8, 'expense'), ('2024-06-01', 6, 'income')]
+
+
+@pytest.mark.parametrize('limit', [1, 2, 3])
+def test_filtered_pages_never_skip_or_repeat_rows(client, headers, rows, limit):
+    keys = _walk(client, headers, limit, '&category=Food&start_date=2024-06-01&end_date=2024-06-01')
+    assert keys == _expected(keys)
+    assert sorted(keys) == sorted(
+        [('2024-06-01', id, 'income') for id in range(1, 7)] + [('2024-06-01', id, 'expense') for id in range(1, 7)]
+    )
@@ -0,0 +1,67 @@
+import pytest
+import ledger
+from models import Expense, Income
+
+
+def _id(app, model, **filters):
+    with app.app_context():
+        return model.query.filter_by(**filters).one().id
+
+
+@pytest.fixture
+def history(app, client, headers):
+    # Writes on several days through every write path: single and list
+    # posts, an edit that moves a row to another day, a delete and a bulk
+    # change. Leaves income 1000 on Jan 5 and expenses 20 on Jan 10, 30 on
+    # Jan 20 and 120 on Feb 15.
+    def send(method, path, body):
+        response = client.open('/routes' + path, method=method, json=body, headers=headers)
+        assert response.status_code < 300, response.get_json()
+
+    send('POST', '/income', {'amount': 1000, 'source': 'Salary', 'date': '2024-01-05'})
+    send('POST', '/expense', {'amount': 100, 'category': 'Food', 'date': '2024-01-10'})
+    send('POST', '/expense', {'amount': 50, 'category': 'Rent', 'date': '2024-02-01'})
+    send('POST', '/expense', [
+        {'amount': 20, 'category': 'Food', 'date': '2024-01-10'},
+        {'amount': 30, 'category': 'Fun', 'date': '2024-03-01'},
+    ])
+    send('PUT', f'/expense/{_id(app, Expense, amount=100)}', {'amount': 120, 'category': 'Food', 'date': '2024-02-15'})
+    send('DELETE', f'/expense/{_id(app, Expense, amount=50)}', None)
+    send('PATCH', '/expense', {'filter': {'category': 'Fun'}, 'set': {'date': '2024-01-20'}})
+
+
+@pytest.mark.parametrize('day, balance', [
+    ('2024-01-04', 0),
+    ('2024-01-05', 1000),
+    ('2024-01-10', 980),
+    ('2024-01-31', 950),
+    ('2024-02-01', 950),
+    ('2024-02-15', 830),
+    ('2024-03-01', 830),
+    ('2025-01-01', 830),
+])
+def test_balance_at(client, headers, history, day, balance):
+    response = client.get(f'/routes/balance/at?date={day}', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json() == {'date': day, 'balance': balance}
+
+
+def test_ledger_matches_base_tables(app, history, user_id):
+    with app.app_context():
+        assert ledger.verify(user_id) == []
+
+
+def test_ledger_follows_income_edits_and_deletes(app, client, headers, history, user_id):
+    income_id = _id(app, Income, source='Salary')
+    response = client.put(f'/routes/income/{income_id}', json={'amount': 900, 'source': 'Salary', 'date': '2024-02-20'},
+                          headers=headers)
+    assert response.status_code == 200
+    assert client.get('/routes/balance/at?date=2024-02-19', headers=headers).get_json()['balance'] == -170
+    assert client.get('/routes/balance/at?date=2024-02-20', headers=headers).get_json()['balance'] == 730
+
+    assert client.delete(f'/routes/income/{income_id}', headers=headers).status_code == 200
+    assert client.delete('/routes/expense', json={'filter': {'category': 'Food'}}, headers=headers).status_code == 200
+    assert client.get('/routes/balance/at?date=2024-12-31', headers=headers).get_json()['balance'] == -30
+    with app.app_context():
+        assert ledger.verify(user_id) == []
+
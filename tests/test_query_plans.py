@@ -0,0 +1,62 @@
+import pytest
+import query_plans
+
+
+@pytest.fixture(scope='module')
+def report():
+    return query_plans.check()
+
+
+@pytest.mark.parametrize('path', query_plans.ENDPOINTS)
+def test_endpoint_queries_use_an_index(report, path):
+    results = [entry for entry in report if entry[0] == path]
+    assert results, f'{path} ran no queries'
+    for _, status, statement, details, scans in results:
+        assert status < 500, f'{path} failed with {status}'
+        assert not scans, f'{path} scans a whole table:\n{" ".join(statement.split())}\n' + '\n'.join(details)
+
+
+@pytest.fixture
+def connection():
+    from sqlalchemy import create_engine
+    from app import db
+    import models  # noqa: F401
+
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    with engine.connect() as connection:
+        yield connection
+
+
+# Without these the check could pass while recognising no scan at all.
+@pytest.mark.parametrize('statement', [
+    'SELECT * FROM expense',
+    'SELECT user_id, sum(amount) FROM expense GROUP BY user_id',
+    'SELECT count(*) FROM income',
+])
+def test_full_scans_are_reported(connection, statement):
+    details, scans = query_plans.full_scans(connection, statement)
+    assert scans, f'{statement} was not reported:\n' + '\n'.join(details)
+
+
+def test_index_searches_are_not_reported(connection):
+    details, scans = query_plans.full_scans(connection, 'SELECT * FROM expense WHERE user_id = ? AND date >= ?', (1, '2024-01-01'))
+    assert not scans, '\n'.join(details)
+
+
+@pytest.mark.parametrize('detail, expected', [
+    ('SCAN expense', True),
+    ('SCAN TABLE expense', True),
+    ('SCAN e', True),
+    ('SCAN TABLE expense AS e', True),
+    ('SCAN expense USING INDEX ix_expense_user_id_date', True),
+    ('SCAN TABLE income USING COVERING INDEX ix_income_user_id_date', True),
+    ('SEARCH expense USING INDEX ix_expense_user_id_date (user_id=? AND date>?)', False),
+    ('SEARCH TABLE expense USING INDEX ix_expense_user_id_date (user_id=?)', False),
+    ('SCAN CONSTANT ROW', False),
+    ('SCAN SUBQUERY 1', False),
+    ('SCAN (subquery-1)', False),
+    ('USE TEMP B-TREE FOR ORDER BY', False),
+])
+def test_plan_rows(detail, expected):
+    assert query_plans.is_full_scan(detail) is expected
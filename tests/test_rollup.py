@@ -0,0 +1,78 @@
+import pytest
+import rollup
+from models import Expense, Income
+
+
+def _id(app, model, **filters):
+    with app.app_context():
+        return model.query.filter_by(**filters).one().id
+
+
+@pytest.fixture
+def send(client, headers):
+    def send(method, path, body=None):
+        response = client.open('/routes' + path, method=method, json=body, headers=headers)
+        assert response.status_code < 300, response.get_json()
+        return response.get_json()
+    return send
+
+
+@pytest.fixture
+def history(app, send):
+    # Leaves March income 3000 and expenses Food 45 (two rows) and Rent 800,
+    # April expense Fun 60.
+    send('POST', '/income', {'amount': 3000, 'source': 'Salary', 'date': '2024-03-01'})
+    send('POST', '/income', {'amount': 200, 'source': 'Gift', 'date': '2024-03-09'})
+    send('POST', '/expense', {'amount': 25, 'category': 'Food', 'date': '2024-03-02'})
+    send('POST', '/expense', [
+        {'amount': 20, 'category': 'Food', 'date': '2024-03-15'},
+        {'amount': 800, 'category': 'Rent', 'date': '2024-03-31'},
+        {'amount': 60, 'category': 'Fun', 'date': '2024-03-20'},
+        {'amount': 15, 'category': 'Fun', 'date': '2024-04-02'},
+    ])
+    # Category and month change in one edit.
+    send('PUT', f'/expense/{_id(app, Expense, amount=60)}', {'amount': 60, 'category': 'Fun', 'date': '2024-04-10'})
+    send('DELETE', f'/expense/{_id(app, Expense, amount=15)}')
+    send('DELETE', f'/income/{_id(app, Income, source="Gift")}')
+
+
+def _summary(client, headers, month):
+    return client.get(f'/routes/monthly_summary?year=2024&month={month}', headers=headers).get_json()
+
+
+def test_rollup_follows_single_writes(app, client, headers, history, user_id):
+    with app.app_context():
+        assert rollup.verify(user_id) == []
+    assert _summary(client, headers, 3) == {'total_income': 3000, 'total_expenses': 845}
+    assert _summary(client, headers, 4) == {'total_income': 0, 'total_expenses': 60}
+
+
+def test_rollup_follows_bulk_writes(app, client, headers, send, history, user_id):
+    send('PATCH', '/expense', {'filter': {'category': 'Food'}, 'set': {'category': 'Groceries', 'date': '2024-04-01'}})
+    send('PATCH', '/expense', {'filter': {'category': 'Rent'}, 'set': {'amount': 850}})
+    send('DELETE', '/expense', {'filter': {'category': 'Fun'}})
+    send('PATCH', '/income', {'filter': {'source': 'Salary'}, 'set': {'date': '2024-04-25'}})
+    with app.app_context():
+        assert rollup.verify(user_id) == []
+    assert _summary(client, headers, 3) == {'total_income': 0, 'total_expenses': 850}
+    assert _summary(client, headers, 4) == {'total_income': 3000, 'total_expenses': 45}
+
+
+def test_budget_status_reads_the_rollup(client, headers, send, history):
+    send('POST', '/budget', {'category': 'Food', 'limit': 100, 'year': 2024, 'month': 3})
+    status = client.get('/routes/budget/status?year=2024&month=3', headers=headers).get_json()
+    assert [(entry['category'], entry['spent']) for entry in status] == [('Food', 45)]
+
+
+def test_verify_reports_drift_and_rebuild_repairs_it(app, history, user_id):
+    from app import db
+    from models import MonthlyRollup
+
+    with app.app_context():
+        row = MonthlyRollup.query.filter_by(user_id=user_id, kind='expense', category='Rent').one()
+        row.total += 1
+        db.session.commit()
+        assert [key for key, _, _ in rollup.verify(user_id)] == [(user_id, 2024, 3, 'expense', 'Rent')]
+        rollup.rebuild(user_id)
+        db.session.commit()
+        assert rollup.verify(user_id) == []
@@ -0,0 +1,128 @@
+import json
+import pytest
+from flask import request
+from marshmallow import ValidationError
+from schemas import budget_validator, expense_validator, financial_goal_validator, income_validator
+
+VALIDATORS = {
+    'income': income_validator,
+    'expense': expense_validator,
+    'budget': budget_validator,
+    'financial_goal': financial_goal_validator,
+}
+
+EXPENSE = {'amount': 12.5, 'category': 'Food', 'date': '2024-03-02', 'description': 'Lunch'}
+INCOME = {'amount': 1000, 'source': 'Salary', 'date': '2024-03-01'}
+BUDGET = {'category': 'Food', 'limit': 300, 'year': 2024, 'month': 3}
+GOAL = {'goal_name': 'Car', 'target_amount': 5000, 'target_date': '2025-06-30'}
+
+# (validator, body) pairs: each well-formed body, then variations that either
+# path may have to accept or reject.
+PAYLOADS = [
+    ('expense', EXPENSE),
+    ('expense', dict(EXPENSE, amount=0)),
+    ('expense', dict(EXPENSE, amount='12.50')),
+    ('expense', dict(EXPENSE, amount=-1)),
+    ('expense', dict(EXPENSE, amount='lots')),
+    ('expense', dict(EXPENSE, amount=True)),
+    ('expense', dict(EXPENSE, amount=None)),
+    ('expense', dict(EXPENSE, category='')),
+    ('expense', dict(EXPENSE, category=5)),
+    ('expense', dict(EXPENSE, date='2024-02-30')),
+    ('expense', dict(EXPENSE, date='02/03/2024')),
+    ('expense', dict(EXPENSE, date='2024-03-02T10:00:00')),
+    ('expense', dict(EXPENSE, date=20240302)),
+    ('expense', dict(EXPENSE, description=None)),
+    ('expense', dict(EXPENSE, note='extra')),
+    ('expense', {'amount': 5}),
+    ('expense', []),
+    ('income', INCOME),
+    ('income', dict(INCOME, amount=-250)),
+    ('income', dict(INCOME, amount='1e3')),
+    ('income', dict(INCOME, source='')),
+    ('income', dict(INCOME, source=['Salary'])),
+    ('income', dict(INCOME, date='2024-13-01')),
+    ('income', dict(INCOME, id=3)),
+    ('budget', BUDGET),
+    ('budget', dict(BUDGET, limit='300')),
+    ('budget', dict(BUDGET, year='2024')),
+    ('budget', dict(BUDGET, month=3.5)),
+    ('budget', dict(BUDGET, month=False)),
+    ('budget', dict(BUDGET, user_id=1)),
+    ('financial_goal', GOAL),
+    ('financial_goal', dict(GOAL, current_amount=250)),
+    ('financial_goal', dict(GOAL, target_date='2025-6-30')),
+    ('financial_goal', dict(GOAL, target_date='30/06/2025')),
+    ('financial_goal', dict(GOAL, target_amount='a lot')),
+    ('financial_goal', dict(GOAL, current_amount=None)),
+]
+
+
+def _reference(kind, body):
+    try:
+        return VALIDATORS[kind].schema.load(body), None
+    except ValidationError as err:
+        return None, err.messages
+
+
+def _typed(result):
+    data, errors = result
+    if data is not None:
+        data = {name: (type(value), value) for name, value in data.items()}
+    return data, errors
+
+
+@pytest.mark.parametrize('kind, body', [('expense', EXPENSE), ('income', INCOME), ('budget', BUDGET), ('financial_goal', GOAL)])
+def test_well_formed_bodies_take_the_fast_path(kind, body):
+    assert VALIDATORS[kind]._fast(body) is not None
+
+
+@pytest.mark.parametrize('kind, body', PAYLOADS)
+def test_load_matches_the_schema(kind, body):
+    assert _typed(VALIDATORS[kind].load(body)) == _typed(_reference(kind, body))
+
+
+@pytest.mark.parametrize('kind, body', PAYLOADS)
+def test_fast_path_only_accepts_what_the_schema_accepts(kind, body):
+    fast = VALIDATORS[kind]._fast(body)
+    if fast is not None:
+        assert _typed((fast, None)) == _typed(_reference(kind, body))
+
+
+@pytest.mark.parametrize('kind, body', PAYLOADS)
+def test_load_request_matches_the_schema(app, kind, body):
+    with app.test_request_context(method='POST', json=body):
+        assert _typed(VALIDATORS[kind].load_request(request)) == _typed(_reference(kind, body))
+
+
+@pytest.mark.parametrize('raw', ['{"amount": NaN, "category": "Food", "date": "2024-03-02"}',
+                                 '{"amount": 1e400, "category": "Food", "date": "2024-03-02"}'])
+def test_non_finite_amounts_are_rejected_on_both_paths(app, raw):
+    body = json.loads(raw)
+    with app.test_request_context(method='POST', data=raw, content_type='application/json'):
+        assert expense_validator.load_request(request) == _reference('expense', body)
+    assert expense_validator.load(body) == _reference('expense', body)
+    assert expense_validator.load(body)[1] == {'amount': ['Special numeric values (nan or infinity) are not permitted.']}
+
+
+def test_load_many_matches_the_schema():
+    bodies = [body for kind, body in PAYLOADS if kind == 'expense' and isinstance(body, dict)]
+    valid, errors = expense_validator.load_many(bodies)
+    assert sorted(valid) + sorted(errors) == sorted(range(len(bodies)))
+    for index, body in enumerate(bodies):
+        data, messages = _reference('expense', body)
+        if messages:
+            assert errors[index] == messages
+        else:
+            assert _typed((valid[index], None)) == _typed((data, None))
+
+
+def test_endpoint_errors_match_the_schema(client, headers):
+    body = dict(EXPENSE, amount=-1, date='soon', note='extra')
+    response = client.post('/routes/expense', json=body, headers=headers)
+    assert response.status_code == 400
+    assert response.get_json() == _reference('expense', body)[1]
+
+    response = client.post('/routes/expense', json=[EXPENSE, body], headers=headers)
+    assert response.status_code == 400
+    assert response.get_json() == {'errors': {'1': _reference('expense', body)[1]}}
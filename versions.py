@@ -0,0 +1,38 @@
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+from app import db
+from models import User, Income, Expense, Budget, FinancialGoal
+
+TRACKED = (Income, Expense, Budget, FinancialGoal)
+
+
+def _bump(connection, user_ids):
+    if user_ids:
+        connection.execute(
+            update(User.__table__)
+            .where(User.__table__.c.id.in_(sorted(user_ids)))
+            .values(data_version=User.__table__.c.data_version + 1)
+        )
+
+
+# For writes that bypass the ORM unit of work (bulk inserts, set-based updates).
+def touch(*user_ids):
+    _bump(db.session.connection(), set(user_ids))
+
+
+def version_select(user_id):
+    return select(User.data_version).where(User.id == user_id)
+
+
+def current(user_id):
+    return db.session.execute(version_select(user_id)).scalar()
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_changed_users(session, flush_context):
+    user_ids = {
+        obj.user_id
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, TRACKED) and obj.user_id is not None
+    }
+    _bump(session.connection(), user_ids)